@@ -1,9 +1,14 @@
-import random
-from typing import List, Dict
+import copy
+import pickle
+from typing import Dict
 import numpy as np
 
 from model_config import ModelConfig
 from agent import Agent
+from population import Population, AgentList, IndexSet
+from scheduler import CalendarQueue
+from mixing import ContactMixing
+from rng import RNGStreams, select
 from intervention.interventions import InterventionManager
 
 class ABM:
@@ -12,35 +17,72 @@ class ABM:
     # and intervention support
 
     # Responsibilities:
-    # - Create population of Agent objects
+    # - Create the population store (NumPy columns, see population.Population)
     # - Advance daily infection/recovery dynamics
     # - Track state counts over time
 
     # Notes:
-    # - Uses random mixing (well‑mixed population) by default
-
-    def __init__(self, cfg: ModelConfig, interventions=None):
+    # - Uses random mixing (well‑mixed population) by default,
+    #   age-structured mixing when cfg.contact_matrix is set
+    # - transmission = "batched" (default) draws all contacts of the day at once,
+    #   "loop" is the reference per-contact implementation
+    # - crn=True (common random numbers): transmission, duration and outcome draws
+    #   are keyed by agent and day (batched transmission), so paired runs with the
+    #   same seed share randomness wherever their trajectories coincide
+    # - `agent_cls` describes the disease (states + transitions),
+    #   model.agents[i] returns a view of agent i as an instance of it
+
+    agent_cls = Agent
+
+    def __init__(self, cfg: ModelConfig, interventions=None, transmission: str = "batched", crn: bool = False):
         self.cfg = cfg
-        self._init_rng()
+        self.transmission = transmission
+        self._init_rng(crn)
 
-        # Create agents (initially all susceptible)
-        # # # self.agents: List[Agent] = [Agent(cfg) for _ in range(cfg.N)]
+        # Create population (initially all susceptible)
         # age groups
         age_assignments = self._assign_age_groups()
-        self.agents = [
-            Agent(cfg, age_group=age_assignments[i])
-            for i in range(self.cfg.N)
-        ]
+        self.pop = Population(cfg.N, list(cfg.age_group_dist.keys()), age_assignments)
+        self.agents = AgentList(self)
+
+        # Age-structured target choice (cfg.contact_matrix), None = uniform mixing
+        self.mixing = (
+            ContactMixing(cfg.contact_matrix, self.pop.age_groups, self.pop.age_group)
+            if cfg.contact_matrix is not None else None
+        )
+
+        # Index of agents in an ACTIVE state (E/I/IA/IS), updated on every transition
+        # so daily phases cost O(prevalence) instead of O(N)
+        self._init_state_lookups()
+        self.active = IndexSet(cfg.N)
+
+        # Running compartment counts: counts[state, age_group]
+        # updated on every transition, queryable any time via count()
+        n_groups = len(self.pop.age_groups)
+        self.counts = np.zeros((len(self._is_active), n_groups), dtype=np.int64)
+        self.counts[self.agent_cls.S] = np.bincount(self.pop.age_group, minlength=n_groups)
+
+        # Progression timers: every transition is filed under its due day,
+        # _progress_states only processes the current day's bucket
+        self.timers = CalendarQueue()
+        self._next_bucket = 0   # first day whose bucket has not been processed yet
+
+        # Test-trace-isolate support (see intervention.contact_log / ContactTracing):
+        # tracer receives the day's contacts and state changes when installed,
+        # quarantined agents (day < quarantined_until) make and receive no contacts
+        self.tracer = None
+        self.quarantined_until = None
+        self._quarantine_end = 0
 
         # Infect I0 randomly
-        initial_I = random.sample(range(cfg.N), cfg.I0)
-        for idx in initial_I:
-            self.agents[idx].infect()
-            # self.agents[idx].state = Agent.I
-
-        # Time-series tracking (store S/I/R counts per day)
-        self.history: Dict[str, list[int]] = {k: [] for k in ["S", "I", "R", "I_cumulative"]}
-        
+        initial_I = self.rng.init.choice(cfg.N, size=cfg.I0, replace=False)
+        self._seed_infections(initial_I)
+
+        # Time-series tracking (store counts per compartment per day)
+        self.history: Dict[str, list[int]] = {
+            k: [] for k in [*self.agent_cls.HISTORY_KEYS, "I_cumulative"]
+        }
+
         self.day: int = 0
         self.total_infections = cfg.starting_total_infections
         self.finished = False
@@ -50,28 +92,111 @@ class ABM:
 
         # Dynamic parameter (modifiable by lockdown etc.)
         self.current_contacts_by_group = cfg.contacts_by_group
-    
 
-    def _init_rng(self) -> None:
-        # Initialize random seeds for reproducible runs
-        if self.cfg.seed is not None:
-            random.seed(self.cfg.seed)
-            np.random.seed(self.cfg.seed)
 
+    def _init_rng(self, crn: bool = False) -> None:
+        # Model-owned random streams (one per phase) for reproducible runs
+        # cfg.seed may be an int, a SeedSequence or None
+        # crn=True keys per-agent draws by agent and day (common random numbers)
+        self.rng = RNGStreams(self.cfg.seed, crn)
+
+
+    def _init_state_lookups(self) -> None:
+        # Per-state-code flags of agent_cls
+        state_codes = np.arange(len(self.agent_cls.HISTORY_KEYS))
+        self._is_active = np.isin(state_codes, self.agent_cls.ACTIVE)
+        self._is_infectious = np.isin(state_codes, self.agent_cls.INFECTIOUS)
 
-    def _assign_age_groups(self):
-        groups = list(self.cfg.age_group_dist.keys())
+
+    def _assign_age_groups(self) -> np.ndarray:
+        # Age-group code (index into age_group_dist keys) for every agent
         probs = list(self.cfg.age_group_dist.values())
 
-        assigned = np.random.choice(groups, size=self.cfg.N, p=probs)
+        assigned = self.rng.init.choice(len(probs), size=self.cfg.N, p=probs)
         return assigned
 
 
+    def _seed_infections(self, idx: np.ndarray) -> None:
+        # Initial infections placed before day 0
+        # Subclasses may override (e.g., start in the exposed state)
+
+        self._infect(idx)
+
+
+    # === state transitions ===
+    def _transition(self, idx: np.ndarray, states, timers=None) -> None:
+        # Single entry point for every state change of the population
+        # `idx` must be unique
+        # `states` / `timers` may be scalars or arrays aligned with `idx`
+        # timers = number of progression phases until the next transition
+        #          (today's counts if it has not run yet), None keeps the current ones
+
+        pop = self.pop
+        old_states = pop.state[idx]
+        pop.state[idx] = states
+        new_states = pop.state[idx]
+
+        was_active = self._is_active[old_states]
+        now_active = self._is_active[new_states]
+        self.active.remove(idx[was_active & ~now_active])
+        self.active.add(idx[now_active & ~was_active])
+
+        if timers is not None:
+            due = self._next_bucket + np.maximum(timers, 1) - 1
+            pop.due_day[idx] = due
+            self.timers.schedule(idx[now_active], np.broadcast_to(due, idx.shape)[now_active])
+
+        if self.tracer is not None:
+            self.tracer.on_transition(idx, old_states, new_states)
+
+        groups = pop.age_group[idx]
+        self._update_counts(old_states, groups, -1)
+        self._update_counts(new_states, groups, +1)
+
+
+    def _update_counts(self, states: np.ndarray, groups: np.ndarray, sign: int) -> None:
+        n_states, n_groups = self.counts.shape
+        keys = states.astype(np.int64) * n_groups + groups
+        delta = np.bincount(keys, minlength=n_states * n_groups).reshape(n_states, n_groups)
+        self.counts += sign * delta
+
+
+    def count(self, state: str | int, group: str | None = None) -> int:
+        # Current number of agents in `state` ("S", "I", ... or code),
+        # optionally restricted to one age group
+        # O(1), safe to call mid-day (e.g., from interventions)
+
+        code = getattr(self.agent_cls, state) if isinstance(state, str) else state
+        if group is None:
+            return int(self.counts[code].sum())
+        return int(self.counts[code, self.pop.age_groups.index(group)])
+
+
+    def _days_remaining(self, idx: np.ndarray) -> np.ndarray:
+        # Timers of agents `idx` in the `timers` convention of _transition
+        return self.pop.due_day[idx].astype(np.int64) - self._next_bucket + 1
+
+
+    def _infectious_agents(self) -> np.ndarray:
+        # Infectious agents, taken from the active index (no population scan)
+        active = self.active.members()
+        return active[self._is_infectious[self.pop.state[active]]]
+
+
+    def _infect(self, idx: np.ndarray) -> None:
+        # S -> I (or S -> E) for the susceptible agents among `idx`
+
+        idx = idx[self.pop.state[idx] == self.agent_cls.S]
+        rng = self.rng.keyed("progression", idx, self._next_bucket, "infection")
+        states, timers = self.agent_cls.on_infection(self.cfg, self.pop, idx, rng)
+        self._transition(idx, states, timers)
+
+
     def step(self) -> bool:
         # Unified daily update pipeline
         # DO NOT override this method in subclasses
         # Instead override phase-specific methods below
-        # 
+        #
         # Returns:
         #   True  = continue simulation
         #   False = terminated early
@@ -86,28 +211,39 @@ class ABM:
 
         # Phase 1: Infectious agents form contacts & mark new infections
         new_infections = self._collect_infections()
-        new_count = len(set(new_infections))
+        new_count = np.unique(new_infections).size
 
         # Phase 2: Apply new infections (batch update for correctness)
         self._apply_infections(new_infections)
 
         # Phase 3: Update infection timers, recover those who expire
         self._progress_states()
-        
+
         # Phase 4: Log daily summary
         self._log_states(new_count)
 
         self.day += 1
         return True
-    
+
+
+    def quarantine(self, idx: np.ndarray, days: int) -> None:
+        # Isolate agents `idx` for `days` days starting today:
+        # every contact from or to them is dropped (batched transmission)
+
+        if self.quarantined_until is None:
+            self.quarantined_until = np.zeros(self.cfg.N, dtype=np.int32)
+        until = self.day + days
+        self.quarantined_until[idx] = np.maximum(self.quarantined_until[idx], until)
+        self._quarantine_end = max(self._quarantine_end, until)
+
 
     # === PHASE 0.5 ===
     def _should_continue(self) -> bool:
         # Check if epidemic is still active
-        # Default behavior: stop when no infected remain
-        # Subclasses may override, e.g., to include 'E' state
+        # Default behavior: stop when nobody is in an ACTIVE state (I, or E/I...)
+        # O(1): size of the active index
 
-        any_infected = any(a.is_infectious for a in self.agents)
+        any_infected = len(self.active) > 0
         return any_infected
 
 
@@ -120,61 +256,146 @@ class ABM:
 
 
     # === PHASE 1 ===
-    def _collect_infections(self) -> list[int]:
+    def _collect_infections(self) -> np.ndarray:
         # Determine which agents become infected today
         # Default implementation = well-mixed SIR
         # Override for network-based or SEIR/SEIAR logic
-        
-        newly_exposed: list[int] = []
 
-        for i, agent in enumerate(self.agents):
-            if not agent.is_infectious:
+        if self.transmission == "batched":
+            return self._collect_infections_batched()
+        elif self.transmission == "loop":
+            return self._collect_infections_loop()
+        else:
+            raise ValueError("Unknown transmission mode")
+
+
+    def _collect_infections_batched(self) -> np.ndarray:
+        # All contacts of the day drawn at once
+        # one array entry per (infectious source, contact) pair
+
+        pop = self.pop
+        contacts = pop.group_values(self.current_contacts_by_group, dtype=np.int64)
+
+        infectious = self._infectious_agents()
+        src, rng = self._contact_stream(infectious, contacts[pop.age_group[infectious]])
+        if self.mixing is None:
+            targets = rng.integers(0, self.cfg.N, size=src.size)
+        else:
+            targets = self.mixing.sample(pop.age_group[src], rng)
+
+        return self._attempt_infections(src, targets, rng)
+
+
+    def _contact_stream(self, sources: np.ndarray, k: np.ndarray):
+        # Sources repeated once per contact and the random source for their draws
+        # (CRN: keyed by source, day and contact number)
+
+        src = np.repeat(sources, k)
+        slot = np.arange(src.size) - np.repeat(np.cumsum(k) - k, k) if self.rng.crn else None
+        return src, self.rng.keyed("contacts", src, self.day, slot=slot)
+
+
+    def _attempt_infections(self, src: np.ndarray, targets: np.ndarray, rng=None) -> np.ndarray:
+        # Vectorized transmission over contact pairs (src[c] -> targets[c])
+        # `rng` = random source aligned with the pairs (default: contacts stream)
+        # Returns the targets infected by at least one contact (may repeat)
+
+        pop = self.pop
+        rng = self.rng.contacts if rng is None else rng
+        if self.day < self._quarantine_end:
+            free = (self.quarantined_until[src] <= self.day) & (self.quarantined_until[targets] <= self.day)
+            src, targets, rng = src[free], targets[free], select(rng, free)
+        if self.tracer is not None:
+            self.tracer.record_contacts(self.day, src, targets)
+
+        open_ = (pop.state[targets] == self.agent_cls.S) & ~pop.vaccinated[targets]
+        src, targets = src[open_], targets[open_]
+        rng = select(rng, open_)
+
+        p = self.agent_cls.infectivity(self.cfg)[pop.state[src]]
+        p *= pop.group_values(self.cfg.susceptibility_by_group)[pop.age_group[targets]]
+        p *= 1 - pop.mask_eff[src]
+
+        return targets[rng.random(targets.size) < p]
+
+
+    def _collect_infections_loop(self) -> np.ndarray:
+        # Reference implementation: one random draw per contact
+
+        newly_exposed: list[int] = []
+        pop = self.pop
+        rng = self.rng.buffered("contacts")
+        infectivity = self.agent_cls.infectivity(self.cfg)
+        contacts = pop.group_values(self.current_contacts_by_group, dtype=np.int64)
+        susceptibility = pop.group_values(self.cfg.susceptibility_by_group)
+        quarantine = self.day < self._quarantine_end
+        made: list[tuple[int, int]] = []   # contacts made (for the tracer)
+
+        for i in self._infectious_agents():
+            if quarantine and self.quarantined_until[i] > self.day:
                 continue
             # each infectious agent makes K contacts
-            k = self.current_contacts_by_group[agent.age_group]
+            k = int(contacts[pop.age_group[i]])
             for _ in range(k):
-                j = random.randrange(self.cfg.N)
-                target = self.agents[j]
-                
+                if self.mixing is None:
+                    j = rng.integers(self.cfg.N)
+                else:
+                    j = int(self.mixing.sample(pop.age_group[[i]], rng)[0])
+                if quarantine and self.quarantined_until[j] > self.day:
+                    continue
+                made.append((i, j))
+
                 # attempt infection
-                if target.is_susceptible and not target.vaccinated:
-                    p = self.cfg.p_infect
-                    sus_factor = self.cfg.susceptibility_by_group[target.age_group]
-                    p *= sus_factor
-                    p *= (1-agent.mask_eff)
-                    if random.random() < p:
+                if pop.state[j] == self.agent_cls.S and not pop.vaccinated[j]:
+                    p = float(infectivity[pop.state[i]])
+                    p *= float(susceptibility[pop.age_group[j]])
+                    p *= (1 - float(pop.mask_eff[i]))
+                    if rng.random() < p:
                         newly_exposed.append(j)
 
-        return newly_exposed
+        if self.tracer is not None:
+            pairs = np.array(made, dtype=np.int64).reshape(-1, 2)
+            self.tracer.record_contacts(self.day, pairs[:, 0], pairs[:, 1])
+
+        return np.array(newly_exposed, dtype=np.int64)
 
 
     # === PHASE 2 ===
-    def _apply_infections(self, infected_indices: list[int]) -> None:
+    def _apply_infections(self, infected_indices: np.ndarray) -> None:
         # Apply new infections (batch update)
-        # Subclasses may override to support exposed/incubation states
-        
-        for idx in infected_indices:
-            self.agents[idx].infect()
-    
+        # duplicates are dropped, first occurrence order is kept
+
+        _, first = np.unique(infected_indices, return_index=True)
+        self._infect(infected_indices[np.sort(first)])
+
 
     # === PHASE 3 ===
     def _progress_states(self) -> None:
         # Update disease progression
-        # Subclasses may override for SEIR, SEIAR, waning immunity, vaccination, etc
-        
-        for ag in self.agents:
-            ag.progress()
+        # only today's calendar bucket is processed (no per-agent countdown)
+        # transitions themselves are defined by agent_cls.on_timer_expired
+
+        pop = self.pop
+        day = self._next_bucket
+        self._next_bucket += 1
+
+        # drop entries of agents that were rescheduled or left the active states
+        due = np.unique(self.timers.pop(day))
+        expired = due[(pop.due_day[due] == day) & self._is_active[pop.state[due]]]
+        if expired.size:
+            rng = self.rng.keyed("progression", expired, day)
+            states, timers = self.agent_cls.on_timer_expired(self.cfg, pop, expired, rng)
+            self._transition(expired, states, timers)
 
 
     # === PHASE 4 ===
     def _log_states(self, new_infections_today: int) -> None:
-        # Record S/I/R counts for plotting
-        # Subclasses may override to include E, IA, IS, D, V, etc
+        # Record compartment counts for plotting
+        # O(number of compartments), read from the running counters
 
-        states = [a.state for a in self.agents]
-        self.history["S"].append(states.count(Agent.S))
-        self.history["I"].append(states.count(Agent.I))
-        self.history["R"].append(states.count(Agent.R))
+        counts = self.counts.sum(axis=1)
+        for key in self.agent_cls.HISTORY_KEYS:
+            self.history[key].append(int(counts[getattr(self.agent_cls, key)]))
         # Update cumulative infections
         self.total_infections += new_infections_today
         self.history["I_cumulative"].append(self.total_infections)
@@ -187,3 +408,77 @@ class ABM:
         for _ in range(days):
             if not self.step():
                 break
+
+
+    # === checkpoints ===
+    def save_checkpoint(self, path: str) -> None:
+        # Persist the complete simulation state (population columns, active index,
+        # counters, timers, RNG streams, day, history, interventions...)
+        # as one binary pickle; resume with load_checkpoint(path)
+
+        with open(path, "wb") as f:
+            pickle.dump((type(self), self._checkpoint_state()), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> "ABM":
+        # Model restored from save_checkpoint(path), ready to continue with step()/run()
+        # (the model class is stored in the checkpoint, e.g.
+        #  ABMNetworkSEIARD.load_checkpoint(path) returns an ABMNetworkSEIARD)
+
+        with open(path, "rb") as f:
+            model_cls, state = pickle.load(f)
+        if not issubclass(model_cls, cls):
+            raise TypeError(f"Checkpoint holds a {model_cls.__name__}, not a {cls.__name__}")
+
+        model = model_cls.__new__(model_cls)
+        model._restore_state(state)
+        return model
+
+
+    # === forking ===
+    def fork(self, interventions=None) -> "ABM":
+        # Independent copy of the simulation at the current day, e.g. to branch
+        # several policies off one shared prefix instead of re-simulating it:
+        #   base.run(30)
+        #   branches = [base.fork([Lockdown(30, 60, 0.5)]), base.fork([Masks(30, 90)])]
+        #
+        # - mutable state (population, counters, timers, history...) is copied,
+        #   read-only data (cfg, contact graph) is shared
+        # - the fork gets fresh RNG streams spawned from this model's SeedSequence
+        # - interventions: None copies the current ones, a list replaces them
+
+        shared = self._fork_shared()
+        state = {
+            k: shared[k] if k in shared else copy.deepcopy(v)
+            for k, v in self._checkpoint_state().items()
+        }
+        if interventions is not None:
+            state["interventions"] = InterventionManager(interventions)
+
+        model = type(self).__new__(type(self))
+        model._restore_state(state)
+        return model
+
+
+    def _fork_shared(self) -> dict:
+        # Attributes fork() does not deep-copy (shared or copied specially)
+        return {"cfg": self.cfg, "rng": self.rng.spawn(), "mixing": self.mixing}
+
+
+    def _checkpoint_state(self) -> dict:
+        # Model attributes to persist; derived structures are rebuilt on restore
+        # Subclasses may override to drop or compact their own attributes
+
+        state = {k: v for k, v in self.__dict__.items() if k not in ("agents", "_is_active", "_is_infectious")}
+        state["active"] = self.active.members()
+        return state
+
+
+    def _restore_state(self, state: dict) -> None:
+        members = state.pop("active")
+        self.__dict__.update(state)
+        self.agents = AgentList(self)
+        self._init_state_lookups()
+        self.active = IndexSet(self.cfg.N)
+        self.active.add(members)
@@ -1,15 +1,18 @@
-import random
-from typing import List
 import numpy as np
 import networkx as nx
 
 from abm import ABM
 from model_config import ModelConfig
-from agent import Agent
+from network import CSRGraph, GraphCache, DEFAULT_GRAPH_CACHE
+import graph_generators
+from snapshots import SnapshotStore
+from rng import int_seed
 
 class ABMNetwork(ABM):
     # ABM using a contact network
-    # infections are only possible across edges in a graph (networkx.Graph)
+    # infections are only possible across edges in a graph
+    # The graph is built with networkx and frozen into CSR arrays (self.graph),
+    # networkx (self.G) is only kept for visualization
 
     # Network types supported:
     # - Erdos-Renyi ("erdos_renyi") : 
@@ -23,75 +26,261 @@ class ABMNetwork(ABM):
     #       A scale-free network model generated by preferential attachment:
     #       new nodes are more likely to connect to already well-connected nodes
 
-    def __init__(self, cfg: ModelConfig, interventions=None, network_type: str = "erdos_renyi", **net_params):
-        super().__init__(cfg, interventions)
+    # transmission (see ABM) additionally accepts "hazard": no contact sampling,
+    # the daily infection probability of every susceptible node is computed exactly
+    # from all its infectious neighbors (_collect_infections_hazard)
+
+    # generator selects how the graph is built:
+    # - "networkx" : nx.*_graph generators (default, reproduces earlier results)
+    # - "numpy"    : graph_generators, emit CSR directly (use for large N)
+
+    # Graphs are cached by (network_type, N, net_params, seed) in `graph_cache`
+    # (process-wide in-memory cache by default, GraphCache(directory) adds an
+    # on-disk memory-mapped copy; None disables caching)
+
+    # Node-state snapshots (self.history_states, used by animate_network_spread):
+    # - record_states : bool, False disables snapshots (aggregate history only)
+    # - states_stride : int, keep every n-th day only
+    # - states_path   : str | None, memory-map the snapshot matrix to this file
+    #                   (checkpoints restore snapshots in memory, see load_checkpoint)
+
+    def __init__(self, cfg: ModelConfig, interventions=None, network_type: str = "erdos_renyi",
+                 transmission: str = "batched", record_states: bool = True, states_stride: int = 1,
+                 states_path: str | None = None, generator: str = "networkx", graph_cache: GraphCache | None = DEFAULT_GRAPH_CACHE,
+                 crn: bool = False, **net_params):
+        super().__init__(cfg, interventions, transmission, crn)
         self.network_type = network_type
         self.net_params = net_params
-        self.G = self._create_network()
-        self.history_states = [] # stores list of agent states each day
-
-
-    def _create_network(self) -> nx.Graph:
-        # Build chosen network type using supplied parameters
-        N = self.cfg.N
-
-        if self.network_type == "erdos_renyi":
-            # p = edge probability
-            p = self.net_params.get("p", 0.01)
-            G = nx.erdos_renyi_graph(N, p, seed=self.cfg.seed)
-        elif self.network_type == "watts_strogatz":
-            # k = avg degree, beta = rewiring probability
-            k = self.net_params.get("k", 6)
-            beta = self.net_params.get("beta", 0.1)
-            G = nx.watts_strogatz_graph(N, k, beta, seed=self.cfg.seed)
-        elif self.network_type == "barabasi_albert":
-            # m = number of edges from each new node
-            m = self.net_params.get("m", 3)
-            G = nx.barabasi_albert_graph(N, m, seed=self.cfg.seed)
-        else:
-            raise ValueError("Unknown network type")
-        
-        return G
+        self.generator = generator
+        self._G = None
+        self.graph = self._load_network(graph_cache)
+
+        # stores agent states each (stride-th) day as a uint8 matrix
+        self.history_states = (
+            SnapshotStore(cfg.N, states_stride, states_path) if record_states else None
+        )
+
+
+    @property
+    def G(self) -> nx.Graph:
+        # networkx view of the contact graph (built lazily, visualization only)
+        if self._G is None:
+            self._G = self.graph.to_networkx()
+        return self._G
+
+
+    def _load_network(self, graph_cache: GraphCache | None) -> CSRGraph:
+        graph, self._G = load_network(
+            self.network_type, self.cfg.N, self.cfg.seed, self.net_params, self.generator, graph_cache
+        )
+        return graph
     
     
     # === PHASE 1 ===
-    def _collect_infections(self) -> list[int]:
-        # Determine which agents become infected today
+    def _collect_infections(self) -> np.ndarray:
+        if self.transmission == "hazard":
+            return self._collect_infections_hazard()
+        return super()._collect_infections()
+
+
+    def _collect_infections_batched(self) -> np.ndarray:
+        # Contacts of all infectious nodes sampled in one CSR gather
+        # (k neighbors per node, WITH replacement)
+
+        pop = self.pop
+        contacts = pop.group_values(self.current_contacts_by_group, dtype=np.int64)
+
+        infectious = self._infectious_agents()
+        k = np.where(self.graph.degree[infectious] > 0, contacts[pop.age_group[infectious]], 0)
+        src, rng = self._contact_stream(infectious, k)
+        targets = self.graph.random_neighbors(src, rng)
+        return self._attempt_infections(src, targets, rng)
+
+
+    def _collect_infections_hazard(self) -> np.ndarray:
+        # Force of infection on all nodes in one sparse matrix-vector product
+        #
+        # Per-edge hazard: infectious i spreads its k_i daily contacts over its d_i
+        # neighbors, each contact transmitting with infectivity_i * (1 - mask_i) * susceptibility_j,
+        # so edge i-j has log-survival log(1 - beta_ij) = -k_i / d_i * infectivity_i * (1 - mask_i) * susceptibility_j
+        # (Poisson number of contacts per edge, same mean as the batched mode)
+        #
+        # log P(j escapes) = sum_i A_ji log(1 - beta_ij) = -(D_susc A D_inf 1_infectious)_j
+        # with D_inf / D_susc the diagonal source / target scalings
+        # P(j infected) = 1 - prod_i (1 - beta_ij), one draw per exposed susceptible node
+        #
+        # Cost O(N + E) per day independent of prevalence and contact counts,
+        # preferable at high prevalence; no contacts are sampled (nothing to trace)
+
+        pop = self.pop
+        infectious = self._infectious_agents()
+        if self.day < self._quarantine_end:
+            infectious = infectious[self.quarantined_until[infectious] <= self.day]
+
+        contacts = pop.group_values(self.current_contacts_by_group)
+        weight = np.zeros(self.cfg.N)
+        weight[infectious] = (
+            contacts[pop.age_group[infectious]] / np.maximum(self.graph.degree[infectious], 1)
+            * self.agent_cls.infectivity(self.cfg)[pop.state[infectious]]
+            * (1 - pop.mask_eff[infectious])
+        )
+        pressure = self.graph.adjacency() @ weight
+
+        targets = np.flatnonzero(pressure > 0)
+        targets = targets[(pop.state[targets] == self.agent_cls.S) & ~pop.vaccinated[targets]]
+        if self.day < self._quarantine_end:
+            targets = targets[self.quarantined_until[targets] <= self.day]
+
+        log_survival = -pressure[targets] * pop.group_values(self.cfg.susceptibility_by_group)[pop.age_group[targets]]
+        rng = self.rng.keyed("contacts", targets, self.day, "hazard")
+        return targets[rng.random(targets.size) < -np.expm1(log_survival)]
+
+
+    def _collect_infections_loop(self) -> np.ndarray:
+        # Reference implementation: one random draw per contact
 
         newly_exposed: list[int] = []
-        
-        for i, agent in enumerate(self.agents):
-            if not agent.is_infectious:
-                continue
+        pop = self.pop
+        rng = self.rng.buffered("contacts")
+        infectivity = self.agent_cls.infectivity(self.cfg)
+        contacts_by_group = pop.group_values(self.current_contacts_by_group, dtype=np.int64)
+        susceptibility = pop.group_values(self.cfg.susceptibility_by_group)
+        quarantine = self.day < self._quarantine_end
+        made: list[tuple[int, int]] = []   # contacts made (for the tracer)
 
+        for i in self._infectious_agents():
+            if quarantine and self.quarantined_until[i] > self.day:
+                continue
             # Get neighbors of agent i in the network
-            neighbors = list(self.G.neighbors(i))
-            if not neighbors:
+            neighbors = self.graph.neighbors(i)
+            if not neighbors.size:
                 continue
 
             # Choose `contacts_per_day` random neighbors to attempt contact
             # sampling WITH replacement to simulate repeated daily contacts
-            contacts = random.choices(neighbors, k=self.current_contacts_by_group[agent.age_group])
+            k = int(contacts_by_group[pop.age_group[i]])
+            contacts = neighbors[rng.integers(0, neighbors.size, size=k)].tolist()
 
             # Attempt infection on each contacted neighbor
             for j in contacts:
-                target = self.agents[j]
-                
+                if quarantine and self.quarantined_until[j] > self.day:
+                    continue
+                made.append((i, j))
+
                 # attempt infection
-                if target.is_susceptible and not target.vaccinated:
-                    p = self.cfg.p_infect
-                    sus_factor = self.cfg.susceptibility_by_group[target.age_group]
-                    p *= sus_factor
-                    p *= (1-agent.mask_eff)
-                    if random.random() < p:
+                if pop.state[j] == self.agent_cls.S and not pop.vaccinated[j]:
+                    p = float(infectivity[pop.state[i]])
+                    p *= float(susceptibility[pop.age_group[j]])
+                    p *= (1 - float(pop.mask_eff[i]))
+                    if rng.random() < p:
                         newly_exposed.append(j)
-        
-        return newly_exposed
+
+        if self.tracer is not None:
+            pairs = np.array(made, dtype=np.int64).reshape(-1, 2)
+            self.tracer.record_contacts(self.day, pairs[:, 0], pairs[:, 1])
+
+        return np.array(newly_exposed, dtype=np.int64)
 
 
     # === PHASE 4 ===
     def _log_states(self, new_infections_today: int) -> None:
         super()._log_states(new_infections_today)
-        
+
         # Record current node states
-        self.history_states.append([a.state for a in self.agents])
\ No newline at end of file
+        if self.history_states is not None:
+            self.history_states.record(self.day, self.pop.state)
+
+
+    def run(self, days: int = 67):
+        # Preallocate the snapshot matrix for the whole run
+        if self.history_states is not None:
+            self.history_states.reserve(days // self.history_states.stride + 1)
+        super().run(days)
+
+
+    # === checkpoints ===
+    def _checkpoint_state(self) -> dict:
+        # The CSR graph is stored with the checkpoint (restoring skips generation),
+        # the networkx view is rebuilt on demand
+        state = super()._checkpoint_state()
+        state["_G"] = None
+        return state
+
+
+    @classmethod
+    def load_checkpoint(cls, path: str, states_path: str | None = None) -> "ABMNetwork":
+        # Snapshots are restored in memory, states_path memory-maps them to a new file
+        model = super().load_checkpoint(path)
+        if states_path is not None and model.history_states is not None:
+            model.history_states = model.history_states.copy(states_path)
+        return model
+
+
+    def _fork_shared(self) -> dict:
+        # Forks share the (never modified) CSR graph, snapshots are copied to memory
+        return {
+            **super()._fork_shared(),
+            "graph": self.graph,
+            "_G": self._G,
+            "history_states": None if self.history_states is None else self.history_states.copy(),
+        }
+
+
+def load_network(network_type: str, N: int, seed, net_params: dict, generator: str = "networkx",
+                 graph_cache: GraphCache | None = DEFAULT_GRAPH_CACHE) -> tuple[CSRGraph, nx.Graph | None]:
+    # CSR graph from the cache, generated (and cached) on a miss
+    # Returns (graph, networkx graph if one was built on the way)
+
+    seed = int_seed(seed)
+    key = GraphCache.key(network_type, N, {**net_params, "generator": generator}, seed)
+    graph = graph_cache.get(key) if graph_cache is not None else None
+    G = None
+    if graph is None:
+        if generator == "numpy":
+            graph = create_csr_network(network_type, N, seed, net_params)
+        elif generator == "networkx":
+            G = create_network(network_type, N, seed, net_params)
+            graph = CSRGraph.from_networkx(G)
+        else:
+            raise ValueError("Unknown graph generator")
+        if graph_cache is not None:
+            graph_cache.put(key, graph)
+    return graph, G
+
+
+def create_network(network_type: str, N: int, seed: int | None, net_params: dict) -> nx.Graph:
+    # Build chosen network type using supplied parameters
+
+    if network_type == "erdos_renyi":
+        # p = edge probability
+        p = net_params.get("p", 0.01)
+        G = nx.erdos_renyi_graph(N, p, seed=seed)
+    elif network_type == "watts_strogatz":
+        # k = avg degree, beta = rewiring probability
+        k = net_params.get("k", 6)
+        beta = net_params.get("beta", 0.1)
+        G = nx.watts_strogatz_graph(N, k, beta, seed=seed)
+    elif network_type == "barabasi_albert":
+        # m = number of edges from each new node
+        m = net_params.get("m", 3)
+        G = nx.barabasi_albert_graph(N, m, seed=seed)
+    else:
+        raise ValueError("Unknown network type")
+    
+    return G
+
+
+def create_csr_network(network_type: str, N: int, seed: int | None, net_params: dict) -> CSRGraph:
+    # Same network types and parameters as create_network, built without networkx
+    rng = np.random.default_rng(seed)
+
+    if network_type == "erdos_renyi":
+        return graph_generators.erdos_renyi(N, net_params.get("p", 0.01), rng)
+    elif network_type == "watts_strogatz":
+        k = net_params.get("k", 6)
+        beta = net_params.get("beta", 0.1)
+        return graph_generators.watts_strogatz(N, k, beta, rng)
+    elif network_type == "barabasi_albert":
+        return graph_generators.barabasi_albert(N, net_params.get("m", 3), rng)
+    else:
+        raise ValueError("Unknown network type")
@@ -1,8 +1,18 @@
-import random
 import numpy as np
 from config import Config
+
+
+def sample_durations(rng, mean: float, std: float, n: int) -> np.ndarray:
+    # Vectorized `max(1, int(normal(mean, std)))` for n agents, one array draw
+    # (rng: Generator, AgentStream or BlockStream)
+    return np.maximum(1, rng.normal(mean, std, n).astype(np.int64))
+
+
 class Agent:
     # Represents an individual
+    # Thin view over one row of the model's Population store (model.pop),
+    # the class itself also describes the disease:
+    # states, which of them are infectious and the (vectorized) transitions
 
     # States:
     # 0 = Susceptible (S)
@@ -11,36 +21,109 @@ class Agent:
 
     S, I, R = range(3)
 
+    HISTORY_KEYS = ("S", "I", "R")   # compartments logged in model.history
+    INFECTIOUS = (I,)                 # states that can infect others
+    SYMPTOMATIC = (I,)                # infectious states that show (detectable cases)
+    ACTIVE = (I,)                     # states with a running progression timer
+
+    __slots__ = ("model", "idx")
+
+
+    def __init__(self, model, idx: int):
+        self.model = model
+        self.idx = idx
+
+
+    @property
+    def params(self) -> Config:
+        return self.model.cfg
+
+
+    @property
+    def state(self) -> int:
+        return int(self.model.pop.state[self.idx])
+
+
+    @state.setter
+    def state(self, value: int) -> None:
+        # the running timer is kept (an expired one fires at the next progression),
+        # set days_remaining afterwards for another period
+        idx = np.array([self.idx])
+        self.model._transition(idx, value, self.model._days_remaining(idx))
 
-    def __init__(self, params: Config, state: int = S, age_group: str = "adult"):
-        self.state: int = state
-        self.params = params
-        self.days_remaining: int = 0
-        self.mask_eff = 0
-        self.age_group = age_group
-        self.vaccinated: bool = False
+
+    @property
+    def days_remaining(self) -> int:
+        # progression phases left before the timer expires
+        return self.model._days_remaining(np.array([self.idx]))[0]
+
+
+    @days_remaining.setter
+    def days_remaining(self, value: int) -> None:
+        self.model._transition(np.array([self.idx]), self.state, value)
+
+
+    @property
+    def mask_eff(self) -> float:
+        return float(self.model.pop.mask_eff[self.idx])
+
+
+    @mask_eff.setter
+    def mask_eff(self, value: float) -> None:
+        self.model.pop.mask_eff[self.idx] = value
+
+
+    @property
+    def vaccinated(self) -> bool:
+        return bool(self.model.pop.vaccinated[self.idx])
+
+
+    @vaccinated.setter
+    def vaccinated(self, value: bool) -> None:
+        self.model.pop.vaccinated[self.idx] = value
+
+
+    @property
+    def age_group(self) -> str:
+        pop = self.model.pop
+        return pop.age_groups[pop.age_group[self.idx]]
 
 
     @property
     def is_infectious(self) -> bool:
-        return self.state == self.I
+        return self.state in self.INFECTIOUS
 
 
     @property
     def is_susceptible(self) -> bool:
         return self.state == self.S
-    
+
 
     def infect(self) -> None:
-        # Transition from S -> I
-        if self.state == self.S:
-            self.state = self.I
-            self.days_remaining = max(1, int(np.random.normal(self.params.inf_period_mean, self.params.inf_period_std)))
-
-
-    def progress(self) -> None:
-        # Infection timer
-        if self.is_infectious:
-            self.days_remaining -= 1
-            if self.days_remaining <= 0:
-                self.state = self.R    
+        # Transition from S -> I (or S -> E for subclasses)
+        self.model._infect(np.array([self.idx]))
+
+
+    # === vectorized transitions (used by the model on index arrays) ===
+    # `rng` is a np.random.Generator (or rng.BlockStream) or, in CRN mode, an rng.AgentStream aligned
+    # with `idx` (draw for a subset of idx through rng.select(rng, mask))
+    @classmethod
+    def infectivity(cls, params: Config) -> np.ndarray:
+        # Per-contact transmission probability indexed by state code
+        p = np.zeros(len(cls.HISTORY_KEYS))
+        p[cls.I] = params.p_infect
+        return p
+
+
+    @classmethod
+    def on_infection(cls, params: Config, pop, idx: np.ndarray, rng):
+        # S -> I for agents `idx`
+        # Returns (new states, timers)
+        return cls.I, sample_durations(rng, params.inf_period_mean, params.inf_period_std, len(idx))
+
+
+    @classmethod
+    def on_timer_expired(cls, params: Config, pop, idx: np.ndarray, rng):
+        # I -> R for agents `idx` whose timer ran out
+        # Returns (new states, timers)
+        return cls.R, 0
@@ -37,3 +37,7 @@ class Config:
     contacts_by_group: dict[str, int] = field(
         default_factory=lambda: {"child": 8,"adult": 5,"senior": 4}
     )
+    # age-structured mixing of the well-mixed models (ABM, TauLeap):
+    # contact_matrix[g][h] = relative weight of group h among the contacts of group g
+    # (see mixing.py), None = targets chosen uniformly from the whole population
+    contact_matrix: dict[str, dict[str, float]] | None = None
@@ -0,0 +1,85 @@
+import copy
+import dataclasses
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+def replicate_seeds(seed: int | None, n: int) -> list[int]:
+    # Independent per-replicate seeds spawned from one SeedSequence
+    children = np.random.SeedSequence(seed).spawn(n)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _run_replicate(model_cls, cfg, interventions, days: int, model_kwargs: dict) -> dict[str, list[int]]:
+    # Executed in a worker process: one replicate = one fresh model
+    with contextlib.redirect_stdout(io.StringIO()):   # silence early-termination messages
+        model = model_cls(cfg, interventions=interventions, **model_kwargs)
+        model.run(days)
+    return model.history
+
+
+def _pad(series: list[int], days: int) -> np.ndarray:
+    # Runs that terminated early keep their last value (nothing changes anymore)
+    out = np.empty(days)
+    n = min(len(series), days)
+    out[:n] = series[:n]
+    out[n:] = series[n - 1] if n else np.nan
+    return out
+
+
+def summarize(histories: list[dict[str, list[int]]], days: int) -> dict[str, dict[str, np.ndarray]]:
+    # Per-day mean, median and quantile bands of every history key
+    #
+    # Returns:
+    # {key: {"mean", "median", "q05", "q50", "q95", "runs"}}, arrays of shape (days,)
+    # ("runs" is the [replicates x days] matrix)
+
+    summary = {}
+    for key in histories[0]:
+        runs = np.stack([_pad(h[key], days) for h in histories])
+        bands = np.quantile(runs, QUANTILES, axis=0)
+        summary[key] = {
+            "mean": runs.mean(axis=0),
+            "median": np.median(runs, axis=0),
+            **{f"q{int(q * 100):02d}": b for q, b in zip(QUANTILES, bands)},
+            "runs": runs,
+        }
+    return summary
+
+
+def run_ensemble(cfg, model_cls, interventions=None, replicates: int = 20, days: int = 100,
+                 processes: int | None = None, **model_kwargs) -> dict[str, dict[str, np.ndarray]]:
+    # Run `replicates` independent copies of a model and aggregate their histories
+    #
+    # Parameters:
+    # cfg           : Config / ConfigSEIRD / ConfigSEIARD, cfg.seed is the ensemble seed
+    # model_cls     : ABM, ABMNetwork, ABMNetworkSEIRD, ABMNetworkSEIARD, TauLeap...
+    # interventions : list of interventions (copied for every replicate)
+    # replicates    : number of runs
+    # days          : simulated days per run
+    # processes     : worker processes (None = all cores, 1 = run serially in-process)
+    # model_kwargs  : forwarded to model_cls (network_type, k, beta, ...)
+    #
+    # Returns:
+    # summarize(...) of all replicate histories
+    #
+    # Example:
+    # bands = run_ensemble(cfg, ABMNetworkSEIARD, [Lockdown(30, 60, 0.5)], replicates=50,
+    #                      days=250, network_type="watts_strogatz", k=10, beta=0.1)
+    # plt.fill_between(range(250), bands["IS"]["q05"], bands["IS"]["q95"])
+
+    cfgs = [dataclasses.replace(cfg, seed=s) for s in replicate_seeds(cfg.seed, replicates)]
+    jobs = [(model_cls, c, copy.deepcopy(interventions), days, model_kwargs) for c in cfgs]
+
+    if processes == 1:
+        histories = [_run_replicate(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            histories = list(pool.map(_run_replicate, *zip(*jobs)))
+
+    return summarize(histories, days)
@@ -0,0 +1,204 @@
+import heapq
+import math
+import numpy as np
+
+from intervention.interventions import Triggered
+from intervention.interventions_examples import ContactTracing
+
+
+class EventEngine:
+    # Continuous-time event-driven (next-reaction / Gillespie) engine for the network models
+    # Alternative to the daily ABM.step(): drives an existing ABMNetwork, ABMNetworkSEIRD
+    # or ABMNetworkSEIARD instance (same Config / ConfigSEIRD / ConfigSEIARD) and fills
+    # its daily `history`, counters and snapshots, so plotting and evaluation keep working
+    #
+    # Usage:
+    #   model = ABMNetworkSEIARD(cfg, network_type="watts_strogatz", k=10, beta=0.1)
+    #   EventEngine(model).run(days=250)
+    #   plot_history(model.history, "SEIARD")
+    #
+    # Events (priority queue ordered by time):
+    # - EXPIRE   : progression timer of an agent runs out (E -> I, I -> R/D ...)
+    # - TRANSMIT : candidate transmission along the edge i -> j
+    #
+    # Notes:
+    # - Transmission along an edge is a Poisson process with rate
+    #     lambda_ij = -k_i * log(1 - p_i * sus_j * (1 - mask_i) / deg_i)
+    #   i.e. the per-day escape probability of k_i contacts sampled with replacement
+    # - Candidates are drawn with an upper-bound rate lambda_max (base contacts times
+    #   every contact multiplier > 1 the interventions declare, no mask) and accepted
+    #   with probability lambda_ij(t) / lambda_max (thinning), so interventions applied
+    #   at day boundaries are taken into account exactly; a dynamic intervention raising
+    #   contacts above the bound raises RuntimeError instead of undersampling
+    # - Quarantined agents (model.quarantine) neither transmit nor get infected;
+    #   no contacts are sampled, so ContactTracing is rejected
+    # - Progression periods are the model's integer durations, starting at the
+    #   exact (continuous) infection time
+    # - Work is proportional to the number of events, not to N x days;
+    #   per-event draws come from block-buffered streams (RNGStreams.buffered)
+
+    EXPIRE, TRANSMIT = 0, 1
+
+    def __init__(self, model):
+        if not hasattr(model, "graph"):
+            raise ValueError("EventEngine requires a network model (ABMNetwork or subclass)")
+
+        for itv in model.interventions.interventions:
+            inner = itv.intervention if isinstance(itv, Triggered) else itv
+            if isinstance(inner, ContactTracing):
+                raise ValueError("ContactTracing needs sampled contacts, use the daily ABM.step()")
+
+        self.model = model
+        self._contact_bound = self._max_contact_factor()
+        self._queue: list[tuple] = []
+        self._seq = 0   # tie breaker for events at equal times
+        self._infections_today = 0
+
+        N = model.cfg.N
+        self._expires_at = np.full(N, np.inf)   # time of the pending EXPIRE event per agent
+        self._infectious_until = np.zeros(N)
+
+        # Already active agents keep their timers (expire at the end of their due day),
+        # already infectious agents start transmitting now
+        t0 = float(model.day)
+        for i in model.active.members():
+            self._schedule_expiry(i, model.pop.due_day[i] + 1.0)
+        for i in model._infectious_agents():
+            self._start_transmission(i, t0, self._expires_at[i])
+
+
+    # === scheduling ===
+    def _push(self, t: float, kind: int, *payload) -> None:
+        heapq.heappush(self._queue, (t, self._seq, kind, *payload))
+        self._seq += 1
+
+
+    def _schedule_expiry(self, i: int, t: float) -> None:
+        self._expires_at[i] = t
+        self.model.pop.due_day[i] = math.ceil(t) - 1   # keeps days_remaining meaningful
+        self._push(t, self.EXPIRE, i)
+
+
+    def _max_contact_factor(self) -> float:
+        # Largest contact multiplier the declared effects can combine to (multipliers multiply)
+        factor = 1.0
+        for itv in self.model.interventions.interventions:
+            inner = itv.intervention if isinstance(itv, Triggered) else itv
+            for kind, _, _, value in inner.effects() or []:
+                if kind == "contacts":
+                    factor *= max(value, 1.0)
+        return factor
+
+
+    def _rates(self, i: int, targets: np.ndarray, contacts: int, mask: float) -> np.ndarray:
+        # Transmission rates i -> targets for `contacts` daily contacts of i
+        m = self.model
+        pop = m.pop
+        deg = m.graph.degree[i]
+        p = m.agent_cls.infectivity(m.cfg)[pop.state[i]] * (1 - mask)
+        sus = pop.group_values(m.cfg.susceptibility_by_group)[pop.age_group[targets]]
+        x = np.minimum(p * sus / deg, 1 - 1e-12)
+        return -contacts * np.log1p(-x)
+
+
+    def _start_transmission(self, i: int, t0: float, t1: float) -> None:
+        # Draw first candidate transmission times to all susceptible neighbors of i
+        m = self.model
+        pop = m.pop
+        self._infectious_until[i] = t1
+
+        nbrs = m.graph.neighbors(i)
+        nbrs = nbrs[(pop.state[nbrs] == m.agent_cls.S) & ~pop.vaccinated[nbrs]]
+        if nbrs.size == 0:
+            return
+
+        max_contacts = m.cfg.contacts_by_group[pop.age_groups[pop.age_group[i]]] * self._contact_bound
+        lam = self._rates(i, nbrs, max_contacts, 0.0)
+        nbrs, lam = nbrs[lam > 0], lam[lam > 0]
+        times = t0 + m.rng.buffered("contacts").exponential(1 / lam)
+        for j, t, l in zip(nbrs.tolist(), times.tolist(), lam.tolist()):
+            if t < t1:
+                self._push(t, self.TRANSMIT, i, j, l)
+
+
+    # === event handlers ===
+    def _apply(self, idx: np.ndarray, states, timers, t: float) -> None:
+        # State change at time t, follow-up timer/transmissions scheduled as events
+        m = self.model
+        m._transition(idx, states)
+        for i, timer in zip(idx.tolist(), np.broadcast_to(timers, idx.shape).tolist()):
+            if m._is_active[m.pop.state[i]]:
+                self._schedule_expiry(i, t + max(timer, 1))
+            if m._is_infectious[m.pop.state[i]]:
+                self._start_transmission(i, t, self._expires_at[i])
+
+
+    def _on_expire(self, t: float, i: int) -> None:
+        m = self.model
+        if self._expires_at[i] != t or not m._is_active[m.pop.state[i]]:
+            return   # stale
+        self._expires_at[i] = np.inf
+        idx = np.array([i])
+        states, timers = m.agent_cls.on_timer_expired(m.cfg, m.pop, idx, m.rng.buffered("progression"))
+        self._apply(idx, states, timers, t)
+
+
+    def _on_transmit(self, t: float, i: int, j: int, lam_max: float) -> None:
+        m = self.model
+        pop = m.pop
+        if pop.state[j] != m.agent_cls.S or pop.vaccinated[j] or t >= self._infectious_until[i]:
+            return
+
+        # thinning: accept with the current (intervention-adjusted) rate
+        contacts = m.current_contacts_by_group[pop.age_groups[pop.age_group[i]]]
+        lam = self._rates(i, np.array([j]), contacts, float(pop.mask_eff[i]))[0]
+        if lam > lam_max * (1 + 1e-9):
+            raise RuntimeError("Contacts above the EventEngine rate bound "
+                               "(a dynamic intervention raised current_contacts_by_group)")
+        if m.day < m._quarantine_end and max(m.quarantined_until[i], m.quarantined_until[j]) > m.day:
+            lam = 0.0
+        if m.rng.buffered("contacts").random() < lam / lam_max:
+            idx = np.array([j])
+            states, timers = m.agent_cls.on_infection(m.cfg, pop, idx, m.rng.buffered("progression"))
+            self._infections_today += 1
+            self._apply(idx, states, timers, t)
+        else:
+            t_next = t + m.rng.buffered("contacts").exponential(1 / lam_max)
+            if t_next < self._infectious_until[i]:
+                self._push(t_next, self.TRANSMIT, i, j, lam_max)
+
+
+    # =================================
+    def step(self) -> bool:
+        # Process all events of the current day, then log it like ABM.step()
+        # Returns False when the epidemic is over
+
+        m = self.model
+        m.interventions.apply(m)
+        self._contact_bound = self._max_contact_factor()   # interventions may have been added
+        if m.tracer is not None:
+            raise RuntimeError("EventEngine samples no contacts, model.tracer is not supported")
+
+        if not m._should_continue():
+            m._on_termination()
+            return False
+
+        end = m.day + 1.0
+        self._infections_today = 0
+        while self._queue and self._queue[0][0] < end:
+            t, _, kind, *payload = heapq.heappop(self._queue)
+            if kind == self.EXPIRE:
+                self._on_expire(t, *payload)
+            else:
+                self._on_transmit(t, *payload)
+
+        m._next_bucket = m.day + 1
+        m._log_states(self._infections_today)
+        m.day += 1
+        return True
+
+
+    def run(self, days: int = 67):
+        for _ in range(days):
+            if not self.step():
+                break
@@ -1,3 +1,4 @@
+import os
 import pickle
 from config import Config
 from abm import ABM
@@ -6,10 +7,20 @@ from seird.config_seird import ConfigSEIRD
 from seird.abm_network_seird import ABMNetworkSEIRD
 from seiard.config_seiard import ConfigSEIARD
 from seiard.abm_network_seiard import ABMNetworkSEIARD
-from visualization import plot_history, plot_network, animate_network_spread
+from visualization import plot_history, plot_network, animate_network_spread, plot_ensemble
 from intervention.interventions_examples import Lockdown, Masks, Vaccines
+from intervention.interventions import Triggered
+from intervention.triggers import Above, Below, prevalence
 from data.evaluate_model import evaluate_model
 from data.load_data import load_data
+from ensemble import run_ensemble, summarize
+from seiard.batched_seiard import BatchedNetworkSEIARD
+from network import GraphCache
+
+
+# 125k-node comparison graphs are kept on disk between runs
+# (<repo>/data/graph_cache, independent of the working directory)
+GRAPH_CACHE = GraphCache(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "graph_cache")))
 
 
 def ex_sir_1():
@@ -241,6 +252,91 @@ def ex_interventions_vaccines_seiard_1():
     ani.save("img/vacc_intervention_seiard_spread_day7.gif", writer="pillow", fps=1)
 
 
+def ex_ensemble_seiard_1():
+    cfg = ConfigSEIARD(
+        N=1500,
+        I0=230,
+        seed=42,
+    )
+    interventions = [
+            Lockdown(start_day=5, end_day=10, reduction_factor=0.5),
+        ]
+
+    # 100 replicates with independent seeds, spread over all cores
+    bands = run_ensemble(cfg, ABMNetworkSEIARD, interventions, replicates=100, days=64,
+                         network_type="watts_strogatz", k=10, beta=0.1, record_states=False)
+
+    fig = plot_ensemble(bands, "SEIARD (+lockdown)", keys=["S", "E", "IA", "IS", "R", "D"])
+    fig.savefig("img/ensemble_lockdown_seiard.png", dpi=300)
+
+
+def ex_batched_ensemble_seiard_1():
+    cfg = ConfigSEIARD(
+        N=1500,
+        I0=230,
+        seed=42,
+    )
+    interventions = [
+            Lockdown(start_day=5, end_day=10, reduction_factor=0.5),
+        ]
+
+    # 500 replicates advanced together on one shared graph
+    batch = BatchedNetworkSEIARD(cfg, replicates=500, interventions=interventions,
+                                 network_type="watts_strogatz", k=10, beta=0.1)
+    batch.run(days=64)
+
+    bands = summarize(batch.histories(), 64)
+    fig = plot_ensemble(bands, "SEIARD (+lockdown)", keys=["S", "E", "IA", "IS", "R", "D"])
+    fig.savefig("img/batched_ensemble_lockdown_seiard.png", dpi=300)
+
+
+def ex_policies_seiard_1():
+    cfg = ConfigSEIARD(
+        N=1500,
+        I0=230,
+        seed=42,
+    )
+    policies = {
+        "lockdown": [Lockdown(start_day=30, end_day=60, reduction_factor=0.5)],
+        "masks": [Masks(start_day=30, end_day=90, compliance=0.8, efficacy=0.5)],
+        "vaccines": [Vaccines(start_day=30, end_day=90, daily_vaccines=0.02, compliance=0.8, efficacy=0.9)],
+    }
+
+    # days 0-29 are simulated once, every policy branches off day 30
+    base = ABMNetworkSEIARD(cfg, network_type="watts_strogatz", k=10, beta=0.1)
+    base.run(days=30)
+
+    for name, interventions in policies.items():
+        branch = base.fork(interventions)
+        branch.run(days=64)
+        fig = plot_history(branch.history, f"SEIARD (+{name} from day 30)")
+        fig.savefig(f"img/policy_{name}_seiard.png", dpi=300)
+
+
+def ex_adaptive_lockdown_sir():
+    cfg = Config(
+        N=100_000,
+        I0=50,
+        contacts_by_group={"child": 10, "adult": 8, "senior": 6},
+        seed=3,
+    )
+    # lock down when more than 2% are infected, lift after 14 days below 0.5%
+    interventions = [
+        Triggered(
+            Lockdown(reduction_factor=0.3),
+            on=Above(prevalence, 0.02),
+            off=Below(prevalence, 0.005, days=14),
+            min_duration=14,
+        ),
+    ]
+
+    model = ABM(cfg, interventions=interventions)
+    model.run(days=300)
+
+    fig = plot_history(model.history, "SIR (+adaptive lockdown)")
+    fig.savefig("img/adaptive_lockdown_sir.png", dpi=300)
+
+
 def ex_compare_sir():
     cfg = Config(
         N = 125_000,
@@ -258,7 +354,7 @@ def ex_compare_sir():
         seed=42
     )
 
-    model_net = ABMNetwork(cfg, network_type="watts_strogatz", k=10, beta=0.1)
+    model_net = ABMNetwork(cfg, network_type="watts_strogatz", k=10, beta=0.1, graph_cache=GRAPH_CACHE)
     model_net.run(days=250)
     # with open("sir_history.pkl", "wb") as f:
     #     pickle.dump(model_net.history, f)
@@ -283,7 +379,7 @@ def ex_compare_seird():
         seed=42,
     )
 
-    model_net = ABMNetworkSEIRD(cfg, network_type="watts_strogatz", k=10, beta=0.1,)
+    model_net = ABMNetworkSEIRD(cfg, network_type="watts_strogatz", k=10, beta=0.1, graph_cache=GRAPH_CACHE)
     model_net.run(days=250)
     
     real_data = load_data("data/processed_data.csv", 125000, 8)
@@ -310,7 +406,7 @@ def ex_compare_seiard():
         seed=42,
     )
 
-    model = ABMNetworkSEIARD(cfg , network_type="watts_strogatz", k=10, beta=0.1,)
+    model = ABMNetworkSEIARD(cfg , network_type="watts_strogatz", k=10, beta=0.1, graph_cache=GRAPH_CACHE)
     model.run(days=250)
     
     real_data = load_data("data/processed_data.csv", 125000, 8)
@@ -0,0 +1,132 @@
+import numpy as np
+
+from network import CSRGraph
+
+
+# NumPy-native generators for the supported network types
+# Same models as the networkx generators, but edges are produced as arrays and
+# frozen straight into CSR (no dict-of-dicts graph), so 1M-node graphs take
+# seconds and a fraction of the memory
+#
+# Results are statistically equivalent to networkx, not edge-for-edge identical
+
+MAX_REWIRE_ROUNDS = 100   # watts_strogatz redraw rounds before giving up on an edge
+
+
+def erdos_renyi(N: int, p: float, rng: np.random.Generator) -> CSRGraph:
+    # G(N, p) by geometric skipping (Batagelj-Brandes): instead of testing every
+    # pair, jump straight to the next edge; work is O(N + E) instead of O(N^2)
+
+    pairs = N * (N - 1) // 2
+    if p <= 0 or pairs == 0:
+        return CSRGraph.from_edges(N, np.empty(0, np.int64), np.empty(0, np.int64))
+
+    # linear pair indices: gaps between consecutive edges are geometric(p)
+    chunks = []
+    last = -1
+    chunk = int(pairs * p + 10 * np.sqrt(pairs * p) + 16)
+    while last < pairs:
+        pos = last + np.cumsum(rng.geometric(p, size=chunk))
+        chunks.append(pos[pos < pairs])
+        last = int(pos[-1])
+    L = np.concatenate(chunks)
+
+    # pair index L -> (v, w), w < v, with L = v * (v - 1) / 2 + w
+    v = ((1 + np.sqrt(1 + 8 * L.astype(np.float64))) // 2).astype(np.int64)
+    v -= v * (v - 1) // 2 > L   # floating point corrections
+    v += (v + 1) * v // 2 <= L
+    w = L - v * (v - 1) // 2
+    return CSRGraph.from_edges(N, v, w)
+
+
+def watts_strogatz(N: int, k: int, beta: float, rng: np.random.Generator) -> CSRGraph:
+    # Ring lattice (every node joined to its k // 2 nearest neighbors on each side),
+    # then the far end of every edge is rewired with probability beta to a uniformly
+    # chosen node, avoiding self-loops and duplicate edges
+    #
+    # As in networkx, an edge whose source is already joined to every other node
+    # keeps its far end (no rewiring possible); redraws are capped at
+    # MAX_REWIRE_ROUNDS, edges still unresolved then stay unrewired
+
+    if k >= N:
+        raise ValueError("k >= N, choose smaller k or larger N")
+    half = k // 2
+    u = np.repeat(np.arange(N, dtype=np.int64), half)
+    v = (u + np.tile(np.arange(1, half + 1), N)) % N
+    if 2 * half >= N - 1:
+        return CSRGraph.from_edges(N, u, v)   # complete graph, nothing to rewire
+
+    lattice = v.copy()
+    todo = np.flatnonzero(rng.random(u.size) < beta)
+    for _ in range(MAX_REWIRE_ROUNDS):
+        if not todo.size:
+            break
+        v[todo] = rng.integers(0, N, todo.size)
+        todo = todo[_duplicates(u, v, todo, N)[todo] | (u[todo] == v[todo])]
+
+    if todo.size:
+        v[todo] = lattice[todo]
+        keep = ~_duplicates(u, v, np.empty(0, dtype=np.int64), N)
+        u, v = u[keep], v[keep]
+
+    return CSRGraph.from_edges(N, u, v)
+
+
+def _duplicates(u: np.ndarray, v: np.ndarray, rewired: np.ndarray, N: int) -> np.ndarray:
+    # Edges repeating an earlier one (existing edges win over the `rewired` ones)
+    is_rewired = np.zeros(u.size, dtype=bool)
+    is_rewired[rewired] = True
+    keys = np.minimum(u, v) * N + np.maximum(u, v)
+    order = np.lexsort((is_rewired, keys))
+    dup = np.zeros(u.size, dtype=bool)
+    dup[order[1:]] = keys[order[1:]] == keys[order[:-1]]
+    return dup
+
+
+def barabasi_albert(N: int, m: int, rng: np.random.Generator) -> CSRGraph:
+    # Preferential attachment with the repeated-nodes array: starting from a star
+    # of m + 1 nodes, node s attaches to m distinct targets drawn uniformly from
+    # the endpoints of all earlier edges (i.e. proportionally to degree)
+    #
+    # Edge e is stored at positions 2e (source) and 2e + 1 (target) of the
+    # repeated-nodes array; a target is a random earlier position, resolved by
+    # following positions until one holds a known node
+
+    if m < 1 or m >= N:
+        raise ValueError(f"Barabasi-Albert network must have m >= 1 and m < N, m = {m}, N = {N}")
+
+    E = m + (N - m - 1) * m
+    src = np.empty(E, dtype=np.int64)
+    src[:m] = 0
+    src[m:] = np.repeat(np.arange(m + 1, N), m)
+
+    # edges of node s may point anywhere before its own first edge
+    first = np.arange(E) - (np.arange(E) - m) % m
+    limit = 2 * first[m:]
+
+    ptr = np.empty(E, dtype=np.int64)
+    ptr[:m] = -1
+    ptr[m:] = (rng.random(E - m) * limit).astype(np.int64)
+
+    while True:
+        # resolve positions to nodes
+        pos = ptr[m:].copy()
+        open_ = np.flatnonzero((pos % 2 == 1) & (pos >= 2 * m))
+        while open_.size:
+            pos[open_] = ptr[pos[open_] // 2]
+            open_ = open_[(pos[open_] % 2 == 1) & (pos[open_] >= 2 * m)]
+        dst = np.where(pos % 2 == 0, src[pos // 2], pos // 2 + 1)
+
+        # targets of one node must be distinct: redraw repeated ones
+        rows = dst.reshape(-1, m)
+        order = np.argsort(rows, axis=1, kind="stable")
+        sorted_rows = np.take_along_axis(rows, order, axis=1)
+        dup = np.zeros_like(rows, dtype=bool)
+        np.put_along_axis(dup, order[:, 1:], sorted_rows[:, 1:] == sorted_rows[:, :-1], axis=1)
+        todo = np.flatnonzero(dup.ravel()) + m
+        if todo.size == 0:
+            break
+        ptr[todo] = (rng.random(todo.size) * limit[todo - m]).astype(np.int64)
+
+    star = np.arange(1, m + 1)
+    return CSRGraph.from_edges(N, src, np.concatenate([star, dst]))
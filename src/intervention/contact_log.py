@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class ContactLog:
+    # Bounded record of the sampled contacts of the last `lookback` days and of
+    # newly detected (symptomatic) cases, installed as model.tracer by ContactTracing
+    #
+    # - ring buffer of `lookback` day slots, every slot holds one day's contacts
+    #   sorted by source (written once per day, oldest day overwritten)
+    # - lookups are binary searches per slot: cost proportional to the number of
+    #   queried cases and their contacts, never to N
+
+    def __init__(self, lookback: int, symptomatic: np.ndarray):
+        self.lookback = lookback
+        self._symptomatic = symptomatic   # bool lookup by state code
+        self._days = np.full(lookback, -1, dtype=np.int64)
+        self._src: list[np.ndarray] = [np.empty(0, dtype=np.int64)] * lookback
+        self._dst: list[np.ndarray] = [np.empty(0, dtype=np.int64)] * lookback
+        self._new_cases: list[np.ndarray] = []
+
+
+    def record_contacts(self, day: int, src: np.ndarray, targets: np.ndarray) -> None:
+        # Called by the model with every contact pair it samples
+        slot = day % self.lookback
+        if self._days[slot] == day:   # more contacts of the same day
+            src = np.concatenate([self._src[slot], src])
+            targets = np.concatenate([self._dst[slot], targets])
+        order = np.argsort(src, kind="stable")
+        self._days[slot] = day
+        self._src[slot] = src[order]
+        self._dst[slot] = targets[order]
+
+
+    def on_transition(self, idx: np.ndarray, old_states: np.ndarray, new_states: np.ndarray) -> None:
+        # Called by the model on every state change, keeps agents turning symptomatic
+        onset = self._symptomatic[new_states] & ~self._symptomatic[old_states]
+        if onset.any():
+            self._new_cases.append(idx[onset])
+
+
+    def pop_new_cases(self) -> np.ndarray:
+        # Cases that became symptomatic since the last call
+        cases = np.concatenate(self._new_cases) if self._new_cases else np.empty(0, dtype=np.int64)
+        self._new_cases = []
+        return cases
+
+
+    def contacts_of(self, cases: np.ndarray, day: int) -> np.ndarray:
+        # Unique agents contacted by `cases` during the `lookback` days before `day`
+        cases = np.sort(cases)
+        found = []
+        for slot in np.flatnonzero((self._days >= day - self.lookback) & (self._days < day)):
+            src, dst = self._src[slot], self._dst[slot]
+            lo = np.searchsorted(src, cases, side="left")
+            n = np.searchsorted(src, cases, side="right") - lo
+            offsets = np.repeat(lo - np.cumsum(n) + n, n) + np.arange(n.sum())
+            found.append(dst[offsets])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
@@ -1,25 +1,253 @@
+import numpy as np
+
+
 class Intervention:
     # Base class for all interventions
+    #
+    # Two ways to act on a model:
+    # - effects()  : declare scheduled parameter changes, compiled by the
+    #                InterventionManager into a per-day timeline (preferred)
+    # - apply()    : arbitrary code run every day (dynamic interventions)
+
+    def effects(self):
+        # Scheduled effects as a list of (kind, start_day, end_day, value),
+        # active on start_day <= day < end_day (end_day None = open-ended)
+        # kinds:
+        # "contacts"    : value = multiplier of contacts_by_group
+        # "masks"       : value = (compliance, efficacy)
+        # "vaccination" : value = daily probability for a susceptible agent to get protected
+        # None = dynamic intervention (apply() is called every day)
+        return None
 
     def apply(self, model):
         # Called each simulation day BEFORE phase 1
         raise NotImplementedError
-    
+
+
+class InterventionTimeline:
+    # Scheduled effects compiled into arrays indexed by day
+    # (end_day None = open-ended, the last array entry holds for all later days)
+    #
+    # Composition of overlapping effects (independent of the list order, except masks):
+    # - contacts    : multipliers multiply
+    # - masks       : the intervention listed last wins on overlapping days
+    #                 (effects of triggered interventions come after the scheduled ones)
+    # - vaccination : independent programs, p = 1 - prod(1 - p_i)
+    #
+    # Model parameters are only touched on days where contacts or masks change,
+    # vaccination runs on the days its rate is > 0; beyond the last effect
+    # everything is back to baseline
+
+    def __init__(self, effects):
+        bounds = [b for _, start, end, _ in effects for b in (start, end) if b is not None]
+        horizon = max(bounds, default=0) + 1
+        self.contact_factor = np.ones(horizon)
+        self.mask_compliance = np.zeros(horizon)
+        self.mask_efficacy = np.zeros(horizon)
+        self.vaccination = np.zeros(horizon)
+
+        for kind, start, end, value in effects:
+            days = slice(max(start, 0), None if end is None else max(end, 0))
+            if kind == "contacts":
+                self.contact_factor[days] *= value
+            elif kind == "masks":
+                self.mask_compliance[days], self.mask_efficacy[days] = value
+            elif kind == "vaccination":
+                self.vaccination[days] = 1 - (1 - self.vaccination[days]) * (1 - value)
+            else:
+                raise ValueError(f"Unknown intervention effect: {kind}")
+
+        self._last_day = None
+        self._applied = None   # (contact factor, (compliance, efficacy)) currently in effect
+        self._eligible = None  # vaccination candidates, valid entries [:_n_eligible]
+        self._n_eligible = 0
+
+
+    def apply(self, model, extra=()):
+        # extra = (kind, value) effects active today in addition to the schedule
+        d = min(model.day, len(self.contact_factor) - 1)
+        factor = self.contact_factor[d]
+        masks = (self.mask_compliance[d], self.mask_efficacy[d])
+        vaccination = self.vaccination[d]
+        for kind, value in extra:
+            if kind == "contacts":
+                factor *= value
+            elif kind == "masks":
+                masks = value
+            elif kind == "vaccination":
+                vaccination = 1 - (1 - vaccination) * (1 - value)
+            else:
+                raise ValueError(f"Unknown intervention effect: {kind}")
+
+        # first call or jump (fork, checkpoint, manager swapped mid-run): full sync
+        if self._last_day is None or model.day != self._last_day + 1:
+            self._applied = None
+            self._eligible = None
+        self._last_day = model.day
+        applied_factor, applied_masks = self._applied or (None, None)
+        self._applied = (factor, masks)
+
+        if factor != applied_factor:
+            model.current_contacts_by_group = {
+                group: int(base_contacts * factor)
+                for group, base_contacts in model.cfg.contacts_by_group.items()
+            }
+
+        if not hasattr(model, "pop"):
+            return   # aggregate models (TauLeap): no agents to put masks on or vaccinate
+
+        if masks != applied_masks and (masks[0] > 0 or model.pop.mask_eff.any()):
+            self._assign_masks(model, *masks)
+
+        if vaccination > 0:
+            self._vaccinate(model, vaccination)
+
+
+    @staticmethod
+    def _assign_masks(model, compliance: float, efficacy: float):
+        # one Bernoulli draw over the mask_eff column (keyed by agent and day in CRN mode)
+        idx = np.arange(model.cfg.N)
+        rng = model.rng.keyed("interventions", idx, model.day, "masks")
+        complies = rng.random(idx.size) < compliance
+        model.pop.mask_eff[:] = np.where(complies, efficacy, 0.0)
+
+
+    def _vaccinate(self, model, rate: float):
+        # Each eligible (susceptible, unvaccinated) agent is protected with probability `rate`:
+        # a binomial number of candidates drawn from a maintained index, O(doses) per day
+        # (CRN: one keyed draw per candidate instead)
+        #
+        # The index is built once; drawn candidates leave it (swap-remove), agents infected
+        # meanwhile stay as stale entries (skipped when drawn) until they make up half of it
+        pop = model.pop
+        S = model.agent_cls.S
+        if self._eligible is None:
+            self._eligible = np.flatnonzero((pop.state == S) & ~pop.vaccinated)
+            self._n_eligible = self._eligible.size
+        elif self._n_eligible > 2 * model.count(S) + 64:
+            candidates = self._eligible[:self._n_eligible]
+            self._eligible = candidates[(pop.state[candidates] == S) & ~pop.vaccinated[candidates]]
+            self._n_eligible = self._eligible.size
+
+        n = self._n_eligible
+        candidates = self._eligible[:n]
+        if model.rng.crn:
+            rng = model.rng.keyed("interventions", candidates, model.day, "vaccines")
+            drawn = np.flatnonzero(rng.random(n) < rate)
+        else:
+            rng = model.rng.interventions
+            drawn = rng.choice(n, size=rng.binomial(n, rate), replace=False)
+
+        agents = candidates[drawn]
+        pop.vaccinated[agents[(pop.state[agents] == S) & ~pop.vaccinated[agents]]] = True
+
+        # swap-remove the drawn positions: the surviving tail fills the holes in front
+        m = drawn.size
+        tail = np.arange(n - m, n)
+        self._eligible[drawn[drawn < n - m]] = self._eligible[tail[~np.isin(tail, drawn)]]
+        self._n_eligible = n - m
+
+
+class Triggered(Intervention):
+    # Runs `intervention` while adaptive conditions hold instead of on fixed days
+    # - scheduled effects(): their window is ignored, the effects hold while on
+    # - dynamic interventions (apply(), e.g. TargetedVaccines, ContactTracing): apply()
+    #   is called every day while on and still checks its own start_day / end_day,
+    #   give them a window covering the run (start_day=0, end_day=None)
+    #
+    # on / off     : conditions (intervention.triggers), e.g.
+    #                Triggered(Lockdown(reduction_factor=0.5),
+    #                          on=Above(prevalence, 0.02), off=Below(prevalence, 0.005, days=14))
+    #                separate thresholds give hysteresis
+    # min_duration : days the intervention stays on at least once triggered
+    # cooldown     : days it stays off at least once lifted
+    #
+    # Conditions read O(1) running counters / history, evaluated once per day
+
+    def __init__(self, intervention, on, off, min_duration=0, cooldown=0):
+        self.intervention = intervention
+        self.on = on
+        self.off = off
+        self.min_duration = min_duration
+        self.cooldown = cooldown
+        self.active = False
+        self.since = None         # day of the last switch
+        self.switches = []        # (day, True/False) history of switches
+
+    def update(self, model) -> bool:
+        # Evaluate today's conditions, returns whether the intervention is on
+        held = 0 if self.since is None else model.day - self.since
+        if self.active:
+            lift = self.off(model)
+            if lift and held >= self.min_duration:
+                self._switch(model, False)
+        elif self.on(model) and (self.since is None or held >= self.cooldown):
+            self._switch(model, True)
+        return self.active
+
+    def _switch(self, model, active):
+        self.active = active
+        self.since = model.day
+        self.switches.append((model.day, active))
+        self.on.reset()
+        self.off.reset()
+
+    def effects_today(self):
+        # (kind, value) of the wrapped scheduled effects, None for a dynamic intervention
+        declared = self.intervention.effects()
+        return None if declared is None else [(kind, value) for kind, _, _, value in declared]
+
+    def apply(self, model):
+        self.intervention.apply(model)
+
 
 class InterventionManager:
     # Maintains and applies all interventions each simulation day
+    # scheduled effects are compiled once into an InterventionTimeline,
+    # triggered interventions add their effects while on,
+    # dynamic interventions are called every day after it, in list order
 
     def __init__(self, interventions=None):
         self.interventions = interventions or []
+        self._timeline = None
 
 
     def add(self, intervention):
         self.interventions.append(intervention)
+        self._timeline = None
+
+
+    def _compile(self):
+        effects, triggered, dynamic = [], [], []
+        for itv in self.interventions:
+            if isinstance(itv, Triggered):
+                triggered.append(itv)
+                continue
+            declared = itv.effects()
+            if declared is None:
+                dynamic.append(itv)
+            else:
+                effects.extend(declared)
+        self._timeline = InterventionTimeline(effects)
+        self._triggered = triggered
+        self._dynamic = dynamic
 
 
     def apply(self, model):
         # Called automatically at the beginning of model.step()
 
-        for itv in self.interventions:
+        if self._timeline is None:
+            self._compile()
+
+        extra, dynamic = [], []
+        for itv in self._triggered:
+            if itv.update(model):
+                effects = itv.effects_today()
+                if effects is None:
+                    dynamic.append(itv)
+                else:
+                    extra.extend(effects)
+
+        self._timeline.apply(model, extra)
+        for itv in self._dynamic + dynamic:
             itv.apply(model)
-    
\ No newline at end of file
@@ -1,60 +1,198 @@
-import random
+import numpy as np
+
 from intervention.interventions import Intervention
+from intervention.contact_log import ContactLog
+from rng import bernoulli_mask, select
+
+
+def _after(end_day):
+    # exclusive end of an inclusive window
+    return None if end_day is None else end_day + 1
 
 
 class Lockdown(Intervention):
     # Reduces contacts_per_day by a factor during a specific interval
+    # (start_day and end_day included, end_day None = open-ended)
 
-    def __init__(self, start_day, end_day, reduction_factor=0.1):
+    def __init__(self, start_day=0, end_day=None, reduction_factor=0.1):
         self.start_day = start_day
         self.end_day = end_day
         self.reduction_factor = reduction_factor
 
-    def apply(self, model):
-        if self.start_day <= model.day <= self.end_day:
-            model.current_contacts_by_group = {
-                group: int(base_contacts * self.reduction_factor)
-                for group, base_contacts in model.cfg.contacts_by_group.items()
-            }
-        else:
-            model.current_contacts_by_group = dict(model.cfg.contacts_by_group)
+    def effects(self):
+        return [("contacts", self.start_day, _after(self.end_day), self.reduction_factor)]
 
 
 class Masks(Intervention):
     # Applies mask effectiveness to agents with some probability
+    # (start_day and end_day included, end_day None = open-ended,
+    #  mask wearers are drawn when the window opens)
     
-    def __init__(self, start_day, end_day, compliance=0.8, efficacy=0.5):
+    def __init__(self, start_day=0, end_day=None, compliance=0.8, efficacy=0.5):
         self.start_day = start_day
         self.end_day = end_day
         self.compliance = compliance
         self.efficacy = efficacy
 
-    def apply(self, model):
-        if model.day < self.start_day or model.day > self.end_day:
-            for a in model.agents:
-                a.mask_eff = 0.0
-            return
+    def effects(self):
+        return [("masks", self.start_day, _after(self.end_day), (self.compliance, self.efficacy))]
 
-        for a in model.agents:
-            if random.random() < self.compliance:
-                a.mask_eff = self.efficacy
-            else:
-                a.mask_eff = 0.0
 
 class Vaccines(Intervention):
-    def __init__(self, start_day, end_day, daily_vaccines, compliance, efficacy):
+    # Every day, each unvaccinated susceptible agent gets a dose with probability
+    # daily_vaccines * compliance, a dose protects with probability efficacy
+    # (start_day included, end_day excluded, end_day None = open-ended)
+    # daily_vaccines is a per-agent probability, >= 1 means a dose every day
+    # (use TargetedVaccines for a number of doses per day)
+
+    def __init__(self, start_day=0, end_day=None, daily_vaccines=0.01, compliance=0.8, efficacy=0.9):
         self.start_day = start_day
         self.end_day = end_day
         self.daily_vaccines = daily_vaccines
         self.compliance = compliance
         self.efficacy = efficacy
 
+    def effects(self):
+        rate = min(max(self.daily_vaccines, 0.0), 1.0) * self.compliance * self.efficacy
+        return [("vaccination", self.start_day, self.end_day, rate)]
+
+
+class TargetedVaccines(Intervention):
+    # Vaccinates up to `daily_doses` agents per day in priority order
+    # (start_day and end_day included, end_day None = open-ended),
+    # a dose protects with probability efficacy
+    #
+    # strategy:
+    # - "age"    : by age group in the order of `priority` (e.g. seniors first),
+    #              random order within a group
+    # - "degree" : by network degree, hubs first (network models)
+    # - "cases"  : neighbors of detected (symptomatic) cases, in order of detection
+    #              (network models)
+    #
+    # The priority order is built once (per-group index arrays / degree-sorted CSR order)
+    # and a pointer advances over it as doses are used, so a day costs O(doses)
+    # Agents no longer susceptible or refusing (1 - compliance) are skipped for good
+
+    def __init__(self, start_day, end_day, daily_doses, strategy="age",
+                 priority=("senior", "adult", "child"), compliance=1.0, efficacy=0.9):
+        if strategy not in ("age", "degree", "cases"):
+            raise ValueError("Unknown vaccination strategy")
+        self.start_day = start_day
+        self.end_day = end_day
+        self.daily_doses = daily_doses
+        self.strategy = strategy
+        self.priority = priority
+        self.compliance = compliance
+        self.efficacy = efficacy
+        self._order = None   # priority order, valid entries [:_size]
+        self._size = 0
+        self._ptr = 0
+
+    def apply(self, model):
+        end = _after(self.end_day)
+        if model.day < self.start_day or (end is not None and model.day >= end):
+            return
+        if self._order is None:
+            self._build_order(model)
+        if self.strategy == "cases":
+            self._enqueue_case_contacts(model)
+        self._allocate(model)
+
+    def _build_order(self, model):
+        pop = model.pop
+        rng = model.rng.interventions
+        if self.strategy == "age":
+            groups = [pop.age_groups.index(g) for g in self.priority]
+            order = [rng.permutation(np.flatnonzero(pop.age_group == g)) for g in groups]
+            self._order = np.concatenate(order)
+        elif not hasattr(model, "graph"):
+            raise ValueError(f"Strategy '{self.strategy}' requires a network model")
+        elif self.strategy == "degree":
+            shuffled = rng.permutation(model.cfg.N)   # random order among equal degrees
+            self._order = shuffled[np.argsort(-model.graph.degree[shuffled], kind="stable")]
+        else:
+            self._order = np.empty(1024, dtype=np.int64)
+            self._detected = np.zeros(model.cfg.N, dtype=bool)
+            self._queued = np.zeros(model.cfg.N, dtype=bool)
+            self._symptomatic = np.isin(np.arange(len(model.agent_cls.HISTORY_KEYS)), model.agent_cls.SYMPTOMATIC)
+        self._size = len(self._order) if self.strategy != "cases" else 0
+
+    def _enqueue_case_contacts(self, model):
+        # new symptomatic cases (from the active index, O(prevalence)),
+        # their not yet queued neighbors are appended to the order
+        active = model.active.members()
+        cases = active[self._symptomatic[model.pop.state[active]] & ~self._detected[active]]
+        self._detected[cases] = True
+
+        contacts = np.unique(model.graph.neighbors_of(cases))
+        contacts = contacts[~self._queued[contacts]]
+        self._queued[contacts] = True
+
+        needed = self._size + contacts.size
+        if needed > len(self._order):
+            order = np.empty(max(needed, 2 * len(self._order)), dtype=np.int64)
+            order[:self._size] = self._order[:self._size]
+            self._order = order
+        self._order[self._size:needed] = contacts
+        self._size = needed
+
+    def _allocate(self, model):
+        pop = model.pop
+        doses = self.daily_doses
+        while doses > 0 and self._ptr < self._size:
+            chunk = self._order[self._ptr:min(self._ptr + 2 * doses, self._size)]
+            rng = model.rng.keyed("interventions", chunk, model.day, "targeted")
+            takes = (pop.state[chunk] == model.agent_cls.S) & ~pop.vaccinated[chunk]
+            takes &= rng.random(chunk.size) < self.compliance
 
+            taken = np.flatnonzero(takes)[:doses]
+            self._ptr += taken[-1] + 1 if taken.size == doses else chunk.size
+            protected = bernoulli_mask(select(rng, taken), taken.size, self.efficacy)
+            pop.vaccinated[chunk[taken][protected]] = True
+            doses -= taken.size
+
+
+class ContactTracing(Intervention):
+    # Test-trace-isolate (start_day and end_day included, end_day None = open-ended)
+    # - contacts sampled by the model are logged over the last `lookback` days
+    #   (ContactLog ring buffer, recording starts `lookback` days before start_day)
+    # - every new symptomatic case is detected with probability `detection`,
+    #   each of its logged contacts is traced with probability `trace_prob`
+    # - detected cases and traced contacts are quarantined for `quarantine_days`:
+    #   all their edges are masked (no contacts from or to them)
+    #
+    # Memory is bounded by `lookback` days of contacts, a day costs
+    # O(detected cases + their contacts); batched and loop transmission only
+    # (the hazard mode samples no contacts: ValueError)
+
+    def __init__(self, start_day, end_day, lookback=7, quarantine_days=14, detection=0.8, trace_prob=0.7):
+        self.start_day = start_day
+        self.end_day = end_day
+        self.lookback = lookback
+        self.quarantine_days = quarantine_days
+        self.detection = detection
+        self.trace_prob = trace_prob
 
     def apply(self, model):
-        if self.start_day <= model.day < self.end_day:
-            for a in model.agents:
-                if a.is_susceptible and not a.vaccinated:
-                    if random.random() < self.daily_vaccines and random.random() < self.compliance:
-                        if random.random() < self.efficacy:
-                            a.vaccinated = True
\ No newline at end of file
+        end = _after(self.end_day)
+        if model.day < self.start_day - self.lookback or (end is not None and model.day >= end):
+            if isinstance(model.tracer, ContactLog):
+                model.tracer = None   # window over: free the log
+            return
+        if not isinstance(model.tracer, ContactLog):
+            if model.transmission == "hazard":
+                raise ValueError("ContactTracing needs sampled contacts, not supported with transmission='hazard'")
+            symptomatic = np.isin(np.arange(len(model.agent_cls.HISTORY_KEYS)), model.agent_cls.SYMPTOMATIC)
+            model.tracer = ContactLog(self.lookback, symptomatic)
+
+        log = model.tracer
+        cases = log.pop_new_cases()
+        if model.day < self.start_day or cases.size == 0:
+            return   # recording only
+
+        rng = model.rng.keyed("interventions", cases, model.day, "detection")
+        detected = cases[bernoulli_mask(rng, cases.size, self.detection)]
+        contacts = log.contacts_of(detected, model.day)
+        rng = model.rng.keyed("interventions", contacts, model.day, "tracing")
+        traced = contacts[bernoulli_mask(rng, contacts.size, self.trace_prob)]
+        model.quarantine(np.concatenate([detected, traced]), self.quarantine_days)
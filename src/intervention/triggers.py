@@ -0,0 +1,51 @@
+# Metrics and conditions for adaptive interventions (see interventions.Triggered)
+# Metrics read the model's running counters and history: O(1) per evaluation,
+# they work for ABM, network models and TauLeap alike
+
+
+def prevalence(model) -> float:
+    # Fraction of the population in an ACTIVE state (E/I/IA/IS...)
+    cls = model.agent_cls
+    active = sum(model.count(key) for key in cls.HISTORY_KEYS if getattr(cls, key) in cls.ACTIVE)
+    return active / model.cfg.N
+
+
+def incidence(model, window: int = 7) -> float:
+    # Rolling mean of daily new infections over the last `window` days, per capita
+    cumulative = model.history["I_cumulative"]
+    if not cumulative:
+        return 0.0
+    days = min(window, len(cumulative))
+    before = cumulative[-days - 1] if len(cumulative) > days else model.cfg.starting_total_infections
+    return (cumulative[-1] - before) / days / model.cfg.N
+
+
+class Condition:
+    # metric(model) compared to a threshold, holds once the comparison has been
+    # true for `days` consecutive evaluations (one evaluation per day)
+
+    def __init__(self, metric, threshold: float, days: int = 1):
+        self.metric = metric
+        self.threshold = threshold
+        self.days = days
+        self._streak = 0
+
+    def __call__(self, model) -> bool:
+        self._streak = self._streak + 1 if self._compare(self.metric(model)) else 0
+        return self._streak >= self.days
+
+    def reset(self):
+        self._streak = 0
+
+    def _compare(self, value: float) -> bool:
+        raise NotImplementedError
+
+
+class Above(Condition):
+    def _compare(self, value: float) -> bool:
+        return value > self.threshold
+
+
+class Below(Condition):
+    def _compare(self, value: float) -> bool:
+        return value < self.threshold
@@ -2,6 +2,7 @@ from examples import ex_sir_1, ex_sirnetwork_1, ex_seird_1, ex_seiard_1, ex_inte
 from examples import ex_interventions_sirnetwork_1, ex_interventions_seird_1, ex_interventions_seiard_1
 from examples import ex_interventions_sirnetwork_2, ex_interventions_seiard_2
 from examples import ex_compare_sir, ex_compare_seird, ex_compare_seiard
+from examples import ex_ensemble_seiard_1, ex_policies_seiard_1, ex_adaptive_lockdown_sir, ex_batched_ensemble_seiard_1
 
 def main():
     # ex_sir_1()
@@ -15,6 +16,10 @@ def main():
     # ex_interventions_seiard_2()
     # ex_interventions_vaccines_seiard_1()
     # ex_interventions_vaccines_seiard_2()
+    # ex_ensemble_seiard_1()
+    # ex_batched_ensemble_seiard_1()
+    # ex_policies_seiard_1()
+    # ex_adaptive_lockdown_sir()
     ex_compare_sir()
     ex_compare_seird()
     ex_compare_seiard()
@@ -0,0 +1,82 @@
+import numpy as np
+
+
+def mixing_fractions(contact_matrix: dict[str, dict[str, float]], age_groups: list[str],
+                     sizes: np.ndarray) -> np.ndarray:
+    # Row-normalized contact matrix: fractions[g, h] = share of the contacts of a
+    # group-g agent made with group h (groups without agents are never contacted)
+    #
+    # contact_matrix[g][h] : relative contact weight of group g with group h,
+    #                        missing entries = 0, e.g. POLYMOD mean contacts per day
+
+    weights = np.array([
+        [float(contact_matrix[g].get(h, 0.0)) for h in age_groups] for g in age_groups
+    ])
+    if (weights < 0).any():
+        raise ValueError("Contact matrix weights must be >= 0")
+
+    weights[:, sizes == 0] = 0.0
+    totals = weights.sum(axis=1)
+    for g, group in enumerate(age_groups):
+        if totals[g] > 0:
+            continue
+        if sizes[g] > 0:
+            raise ValueError(f"Contact matrix row '{group}' has no contacts with populated groups")
+        weights[g] = sizes > 0   # row never used (no agents in the group)
+        totals[g] = weights[g].sum()
+    return weights / totals[:, None]
+
+
+class ContactMixing:
+    # Age-structured choice of contact targets for the well-mixed engine
+    # (built from cfg.contact_matrix, the number of contacts still comes from
+    #  contacts_by_group / current_contacts_by_group)
+    #
+    # - target group: one Walker alias table per source group,
+    #   O(1) per contact (one column draw + one coin) for any number of groups
+    # - target agent: agents sorted by group, per-group index arrays are slices of
+    #   `members`, O(1) per contact for any N
+    #
+    # Uniform mixing = every row proportional to the group sizes
+
+    def __init__(self, contact_matrix: dict[str, dict[str, float]], age_groups: list[str], age_group: np.ndarray):
+        G = len(age_groups)
+        self.members = np.argsort(age_group, kind="stable")
+        self.size = np.bincount(age_group, minlength=G)
+        self.start = np.cumsum(self.size) - self.size
+
+        self.fractions = mixing_fractions(contact_matrix, age_groups, self.size)
+        self.prob, self.alias = self._alias_tables(self.fractions)
+
+
+    @staticmethod
+    def _alias_tables(fractions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Vose's alias method, one row per source group:
+        # column c is kept with probability prob[g, c], otherwise replaced by alias[g, c]
+
+        n_rows, G = fractions.shape
+        prob = np.ones((n_rows, G))
+        alias = np.tile(np.arange(G), (n_rows, 1))
+        for g in range(n_rows):
+            scaled = fractions[g] * G
+            small = [c for c in range(G) if scaled[c] < 1]
+            large = [c for c in range(G) if scaled[c] >= 1]
+            while small and large:
+                s, l = small.pop(), large.pop()
+                prob[g, s] = scaled[s]
+                alias[g, s] = l
+                scaled[l] -= 1 - scaled[s]
+                (small if scaled[l] < 1 else large).append(l)
+        return prob, alias
+
+
+    def sample(self, source_groups: np.ndarray, rng) -> np.ndarray:
+        # One target agent per contact, source_groups[c] = age group of the contacting agent
+        # (three uniform draws per contact from `rng`)
+
+        n = source_groups.size
+        col = rng.integers(0, self.prob.shape[1], size=n)
+        keep = rng.random(n) < self.prob[source_groups, col]
+        group = np.where(keep, col, self.alias[source_groups, col])
+        offset = (rng.random(n) * self.size[group]).astype(np.int64)
+        return self.members[self.start[group] + offset]
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+
+
+class CSRGraph:
+    # Undirected contact graph frozen into compressed sparse row arrays
+    #
+    # Attributes:
+    # N       : int, number of nodes
+    # indptr  : int64[N+1], neighbors of node i are indices[indptr[i]:indptr[i+1]]
+    # indices : int32[2*E], concatenated neighbor lists (every edge stored both ways)
+    # degree  : int64[N]
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.N = len(self.indptr) - 1
+        self.degree = np.diff(self.indptr)
+        self._adjacency = None
+
+
+    def __getstate__(self):
+        # the scipy matrix is derived data, rebuilt on first use
+        return {**self.__dict__, "_adjacency": None}
+
+
+    @classmethod
+    def from_edges(cls, N: int, u: np.ndarray, v: np.ndarray) -> "CSRGraph":
+        # Build from an undirected edge list (u[e], v[e])
+        rows = np.concatenate([u, v])
+        cols = np.concatenate([v, u])
+        order = np.argsort(rows, kind="stable")
+
+        indptr = np.zeros(N + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=N), out=indptr[1:])
+        return cls(indptr, cols[order])
+
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph) -> "CSRGraph":
+        # Nodes must be labelled 0..N-1 (as produced by the nx generators)
+        edges = np.array(G.edges(), dtype=np.int64).reshape(-1, 2)
+        return cls.from_edges(G.number_of_nodes(), edges[:, 0], edges[:, 1])
+
+
+    def to_networkx(self) -> nx.Graph:
+        # Rebuild a networkx graph (visualization only)
+        G = nx.Graph()
+        G.add_nodes_from(range(self.N))
+        rows = np.repeat(np.arange(self.N), self.degree)
+        upper = rows < self.indices
+        G.add_edges_from(zip(rows[upper].tolist(), self.indices[upper].tolist()))
+        return G
+
+
+    def adjacency(self) -> sp.csr_array:
+        # Symmetric 0/1 adjacency matrix over the same CSR arrays
+        # (built once per graph, shared by every model using it)
+        if self._adjacency is None:
+            data = np.ones(self.indices.size)
+            self._adjacency = sp.csr_array((data, self.indices, self.indptr), shape=(self.N, self.N))
+        return self._adjacency
+
+
+    def neighbors(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+
+    def neighbors_of(self, nodes: np.ndarray) -> np.ndarray:
+        # Concatenated neighbor lists of `nodes` (one vectorized gather)
+        deg = self.degree[nodes]
+        offsets = np.repeat(self.indptr[nodes] - np.cumsum(deg) + deg, deg) + np.arange(deg.sum())
+        return self.indices[offsets]
+
+
+    def random_neighbors(self, src: np.ndarray, rng) -> np.ndarray:
+        # One uniformly chosen neighbor of every node src[i] (degree must be > 0)
+        deg = self.degree[src]
+        offsets = self.indptr[src] + (rng.random(src.size) * deg).astype(np.int64)
+        return self.indices[offsets]
+
+
+class GraphCache:
+    # Cache of generated contact graphs, keyed by (network_type, N, net_params, seed)
+    # - in memory: last `max_items` graphs (shared between models, never mutated)
+    # - on disk (optional): indptr/indices as raw .npy files, loaded memory-mapped,
+    #   so repeated runs on the same graph skip generation entirely
+    # Unseeded graphs (seed=None) are random by definition and never cached
+    # Thread-safe: the in-memory LRU is guarded by a lock (models in several threads
+    # may share one cache), disk writes go through per-thread temporary files
+
+    def __init__(self, directory: str | None = None, max_items: int = 4):
+        self.directory = directory
+        self.max_items = max_items
+        self._memory: OrderedDict[str, CSRGraph] = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def key(network_type: str, N: int, net_params: dict, seed: int | None) -> str | None:
+        if seed is None:
+            return None
+        desc = repr((network_type, N, sorted(net_params.items()), seed))
+        return f"{network_type}_{N}_{hashlib.sha1(desc.encode()).hexdigest()[:16]}"
+
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + ".indptr.npy", base + ".indices.npy"
+
+
+    def get(self, key: str | None) -> CSRGraph | None:
+        if key is None:
+            return None
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self.directory is not None:
+            indptr_path, indices_path = self._paths(key)
+            if os.path.exists(indptr_path) and os.path.exists(indices_path):
+                graph = CSRGraph(np.load(indptr_path, mmap_mode="r"), np.load(indices_path, mmap_mode="r"))
+                self._remember(key, graph)
+                return graph
+        return None
+
+
+    def put(self, key: str | None, graph: CSRGraph) -> None:
+        if key is None:
+            return
+        self._remember(key, graph)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            for path, array in zip(self._paths(key), (graph.indptr, graph.indices)):
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+                np.save(tmp, array)
+                os.replace(tmp, path)   # atomic, concurrent runs never see partial files
+
+
+    def _remember(self, key: str, graph: CSRGraph) -> None:
+        with self._lock:
+            self._memory[key] = graph
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+
+# Process-wide in-memory cache used by ABMNetwork unless told otherwise
+DEFAULT_GRAPH_CACHE = GraphCache()
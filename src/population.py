@@ -0,0 +1,100 @@
+from collections.abc import Sequence
+import numpy as np
+
+
+class Population:
+    # Column store of the whole population
+    # every agent attribute is one NumPy array indexed by agent id
+
+    # Columns:
+    # state          : int8,    compartment code (S/I/R... constants of the Agent class)
+    # due_day        : int16,   day on which the running progression timer expires
+    # age_group      : uint8,   index into `age_groups`
+    # mask_eff       : float32, mask efficacy worn by the agent (0 = no mask)
+    # vaccinated     : bool,    vaccination flag
+
+    def __init__(self, N: int, age_groups: list[str], age_codes: np.ndarray):
+        self.N = N
+        self.age_groups = list(age_groups)
+
+        self.state = np.zeros(N, dtype=np.int8)
+        self.due_day = np.zeros(N, dtype=np.int16)
+        self.age_group = np.asarray(age_codes, dtype=np.uint8)
+        self.mask_eff = np.zeros(N, dtype=np.float32)
+        self.vaccinated = np.zeros(N, dtype=bool)
+
+
+    def group_values(self, by_group: dict, dtype=np.float64) -> np.ndarray:
+        # Lookup table indexed by age-group code
+        # ex: pop.group_values(cfg.susceptibility_by_group)[pop.age_group[idx]]
+        return np.array([by_group[g] for g in self.age_groups], dtype=dtype)
+
+
+class AgentList(Sequence):
+    # Read/write per-agent views over the population store
+    # keeps `model.agents[i].state` style code working
+    # Views are created on access, nothing is stored per agent
+
+    def __init__(self, model):
+        self.model = model
+
+
+    def __len__(self) -> int:
+        return self.model.pop.N
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("agent index out of range")
+        return self.model.agent_cls(self.model, int(i))
+
+
+class IndexSet:
+    # Set of agent ids backed by two arrays (dense member list + position of each agent)
+    # O(1) size, O(k) batch add/remove, O(size) listing
+    # Used to keep the currently active (E/I/IA/IS) agents without scanning the population
+
+    def __init__(self, N: int):
+        self._members = np.empty(N, dtype=np.int64)
+        self._pos = np.full(N, -1, dtype=np.int64)
+        self._size = 0
+
+
+    def __len__(self) -> int:
+        return self._size
+
+
+    def __contains__(self, i: int) -> bool:
+        return self._pos[i] >= 0
+
+
+    def members(self) -> np.ndarray:
+        # Copy of the current members (arbitrary but deterministic order)
+        return self._members[:self._size].copy()
+
+
+    def add(self, idx: np.ndarray) -> None:
+        # `idx` must be unique and not yet in the set
+        k = len(idx)
+        self._members[self._size:self._size + k] = idx
+        self._pos[idx] = np.arange(self._size, self._size + k)
+        self._size += k
+
+
+    def remove(self, idx: np.ndarray) -> None:
+        # `idx` must be unique members of the set
+        # holes left inside the kept prefix are filled with survivors from the tail
+        pos = self._pos[idx]
+        self._pos[idx] = -1
+        new_size = self._size - len(idx)
+
+        holes = pos[pos < new_size]
+        tail = self._members[new_size:self._size]
+        movers = tail[self._pos[tail] >= 0]
+        self._members[holes] = movers
+        self._pos[movers] = holes
+        self._size = new_size
@@ -0,0 +1,227 @@
+import math
+import zlib
+import numpy as np
+
+
+class RNGStreams:
+    # Random number streams owned by one model
+    # one numpy Generator per simulation phase, all spawned from a single SeedSequence,
+    # so models never touch the global `random` / `np.random` state and can run
+    # side by side (same process, threads) without corrupting each other's randomness
+    #
+    # Streams:
+    # init          : population setup (age groups, initial infections)
+    # contacts      : contact sampling and transmission draws
+    # progression   : period durations and progression outcomes
+    # interventions : draws made by interventions (mask compliance, vaccination...)
+
+    #
+    # Common random numbers (crn=True):
+    # draws that belong to agents (keyed(...)) come from counter-based streams keyed
+    # by (seed, phase, agent, day), so two runs with the same seed, e.g. baseline and
+    # +Lockdown, make the same draws wherever their trajectories coincide
+    # (paired comparisons need far fewer replicates)
+    #
+    # Scalar draws (per-contact loops, event-driven engine) go through buffered(phase),
+    # which hands out pre-generated blocks instead of one Generator call per value
+
+    PHASES = ("init", "contacts", "progression", "interventions")
+
+    def __init__(self, seed: int | np.random.SeedSequence | None = None, crn: bool = False,
+                 _crn_key: int | None = None):
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_seq = seed
+        for name, child in zip(self.PHASES, seed.spawn(len(self.PHASES))):
+            setattr(self, name, np.random.Generator(np.random.PCG64(child)))
+
+        self.crn = crn
+        self._crn_key = int(seed.generate_state(1, np.uint64)[0]) if _crn_key is None else _crn_key
+        self._buffers: dict[str, BlockStream] = {}
+
+
+    def spawn(self) -> "RNGStreams":
+        # New, statistically independent set of streams derived from this one
+        # (CRN streams are kept: forks stay paired with their parent)
+        return RNGStreams(self.seed_seq.spawn(1)[0], self.crn, self._crn_key if self.crn else None)
+
+
+    def keyed(self, phase: str, idx: np.ndarray, day: int, tag: str = "", slot: np.ndarray | None = None):
+        # Random source for draws belonging to agents `idx` on `day`
+        # - default: the phase Generator itself
+        # - crn=True: AgentStream keyed by (phase, tag, agent, day, slot)
+        # Use select(rng, mask) before drawing for a subset of `idx`
+
+        if not self.crn:
+            return getattr(self, phase)
+        key = _mix(np.array([self._crn_key ^ zlib.crc32(f"{phase}/{tag}".encode())], dtype=np.uint64))
+        return AgentStream(key, idx, day, slot)
+
+
+    def buffered(self, phase: str) -> "BlockStream":
+        # Block-buffered view of the phase Generator (one per phase, created on first use)
+        stream = self._buffers.get(phase)
+        if stream is None:
+            stream = self._buffers[phase] = BlockStream(getattr(self, phase))
+        return stream
+
+
+class BlockStream:
+    # Random draws served from pre-generated blocks of a Generator
+    # (uniforms and standard normals, refilled `block` values at a time)
+    #
+    # A scalar Generator call costs ~1-3 us of overhead, a buffered scalar ~0.2 us;
+    # same draw methods as np.random.Generator (random, normal, integers, exponential),
+    # scalars for size=None, arrays otherwise (large arrays bypass the buffers)
+
+    def __init__(self, generator: np.random.Generator, block: int = 4096):
+        self._uniforms = BlockBuffer(generator.random, block)
+        self._normals = BlockBuffer(generator.standard_normal, block)
+
+
+    def random(self, size=None):
+        return self._uniforms.take(size)
+
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        if size is None and (np.ndim(loc) or np.ndim(scale)):
+            size = np.broadcast_shapes(np.shape(loc), np.shape(scale))
+        return loc + scale * self._normals.take(size)
+
+
+    def integers(self, low, high=None, size=None):
+        if high is None:
+            low, high = 0, low
+        if size is None:
+            return low + int(self._uniforms.take() * (high - low))
+        return low + (self._uniforms.take(size) * (high - low)).astype(np.int64)
+
+
+    def exponential(self, scale=1.0, size=None):
+        if size is None and np.ndim(scale):
+            size = np.shape(scale)
+        if size is None:
+            return -scale * math.log1p(-self._uniforms.take())
+        return -scale * np.log1p(-self._uniforms.take(size))
+
+
+class BlockBuffer:
+    # One block of pre-generated values, handed out in order
+    # (kept both as an array for slices and as a list for fast scalar access)
+
+    def __init__(self, draw, block: int):
+        self._draw = draw
+        self._block = block
+        self._refill()
+
+
+    def _refill(self) -> None:
+        self._values = self._draw(self._block)
+        self._list = self._values.tolist()
+        self._pos = 0
+
+
+    def take(self, size=None):
+        if size is None:
+            if self._pos == self._block:
+                self._refill()
+            value = self._list[self._pos]
+            self._pos += 1
+            return value
+
+        n = int(np.prod(size))
+        if n > self._block // 4:
+            return self._draw(size)
+        if self._pos + n > self._block:
+            self._refill()
+        values = self._values[self._pos:self._pos + n].reshape(size)
+        self._pos += n
+        return values
+
+
+class AgentStream:
+    # Counter-based random numbers (splitmix64 hash of the key) for a set of agents,
+    # value i of every draw belongs to agent idx[i] (and slot[i], e.g. contact number)
+    # Same draw methods as np.random.Generator, size must equal len(idx);
+    # successive draws (and subsets from select) advance a shared draw counter
+
+    def __init__(self, key: np.ndarray, idx: np.ndarray, day: int, slot: np.ndarray | None = None,
+                 _counter: list[int] | None = None):
+        self._key = key
+        self._idx = np.asarray(idx)
+        self._day = day
+        self._slot = slot
+        self._counter = [0] if _counter is None else _counter
+
+
+    def __len__(self) -> int:
+        return len(self._idx)
+
+
+    def subset(self, mask: np.ndarray) -> "AgentStream":
+        slot = None if self._slot is None else self._slot[mask]
+        return AgentStream(self._key, self._idx[mask], self._day, slot, self._counter)
+
+
+    def _bits(self, size) -> np.ndarray:
+        if size is not None and np.prod(size) != len(self._idx):
+            raise ValueError("AgentStream draws must have one value per agent")
+        draw = self._counter[0]
+        self._counter[0] += 1
+
+        slot = np.zeros(len(self._idx), dtype=np.uint64) if self._slot is None else self._slot.astype(np.uint64)
+        h = _mix(self._key ^ (self._idx.astype(np.uint64) * _GOLDEN))
+        h = _mix(h ^ (np.uint64(self._day) << np.uint64(32)) ^ slot)
+        return _mix(h ^ (np.full(1, draw + 1, dtype=np.uint64) * _GOLDEN))
+
+
+    def random(self, size=None) -> np.ndarray:
+        return (self._bits(size) >> np.uint64(11)) * (1.0 / (1 << 53))
+
+
+    def normal(self, loc=0.0, scale=1.0, size=None) -> np.ndarray:
+        # Box-Muller on two uniforms
+        u1 = 1.0 - self.random(size)
+        u2 = self.random(size)
+        return loc + scale * np.sqrt(-2.0 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+    def integers(self, low, high=None, size=None) -> np.ndarray:
+        if high is None:
+            low, high = 0, low
+        return low + (self.random(size) * (high - low)).astype(np.int64)
+
+
+def select(rng, mask: np.ndarray):
+    # Random source for a subset of the agents a keyed(...) source was made for
+    return rng.subset(mask) if isinstance(rng, AgentStream) else rng
+
+
+def bernoulli_mask(rng, n: int, p: float) -> np.ndarray:
+    # n independent Bernoulli(p) trials as a boolean mask
+    # Generator: binomial number of successes placed without replacement (O(successes) draws)
+    # AgentStream: one keyed uniform per agent
+    if isinstance(rng, AgentStream):
+        return rng.random(n) < p
+    mask = np.zeros(n, dtype=bool)
+    mask[rng.choice(n, size=rng.binomial(n, p), replace=False)] = True
+    return mask
+
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(x):
+    # splitmix64 finalizer
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def int_seed(seed: int | np.random.SeedSequence | None) -> int | None:
+    # Plain int seed for libraries that need one (networkx generators)
+    if isinstance(seed, np.random.SeedSequence):
+        return int(seed.generate_state(1)[0])
+    return seed
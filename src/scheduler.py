@@ -0,0 +1,36 @@
+import numpy as np
+
+
+class CalendarQueue:
+    # Bucketed timer scheduler (calendar queue) for disease-progression events
+    # every scheduled transition is filed under the day it is due,
+    # so a day's progression work is proportional to that day's transitions
+    #
+    # Entries are not removed when an agent is rescheduled,
+    # the caller validates popped entries against the agent's current due day
+
+    def __init__(self):
+        self._buckets: dict[int, list[np.ndarray]] = {}
+
+
+    def __len__(self) -> int:
+        # number of (possibly stale) pending entries
+        return sum(len(a) for chunks in self._buckets.values() for a in chunks)
+
+
+    def schedule(self, idx: np.ndarray, due: np.ndarray) -> None:
+        # File agents idx[i] under day due[i]
+        if len(idx) == 0:
+            return
+        order = np.argsort(due, kind="stable")
+        days, starts = np.unique(due[order], return_index=True)
+        for day, chunk in zip(days.tolist(), np.split(idx[order], starts[1:])):
+            self._buckets.setdefault(day, []).append(chunk)
+
+
+    def pop(self, day: int) -> np.ndarray:
+        # Remove and return every entry filed under `day`
+        chunks = self._buckets.pop(day, None)
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
@@ -1,7 +1,7 @@
-import random
 import numpy as np
 
-from agent import Agent
+from agent import Agent, sample_durations
+from rng import select
 from seiard.config_seiard import ConfigSEIARD
 
 class AgentSEIARD(Agent):
@@ -10,62 +10,56 @@ class AgentSEIARD(Agent):
     # States:
     # 0 = Susceptible (S)
     # 1 = Exposed (E)
-    # 2 = Infectious Asymptomatic (IA)
-    # 3 = Infectious Symptomatic (IS)
+    # 2 = Infectious Symptomatic (IS)
+    # 3 = Infectious Asymptomatic (IA)
     # 4 = Recovered (R)
     # 5 = Dead (D)
 
     S, E, IS, IA, R, D = range(6)
 
+    HISTORY_KEYS = ("S", "E", "IA", "IS", "R", "D")
+    INFECTIOUS = (IA, IS)
+    SYMPTOMATIC = (IS,)
+    ACTIVE = (E, IA, IS)
 
-    def __init__(self, params: ConfigSEIARD, state: int = S, age_group: str = "adult"):
-        self.state: int = state
-        self.params = params
-        self.days_remaining: int = 0
-        self.mask_eff = 0
-        self.age_group = age_group
-        self.vaccinated = False
+    __slots__ = ()
 
 
-    def infect(self):
+    @classmethod
+    def infectivity(cls, params: ConfigSEIARD) -> np.ndarray:
+        p = np.zeros(len(cls.HISTORY_KEYS))
+        p[cls.IS] = params.p_infect_IS
+        p[cls.IA] = params.p_infect_IA
+        return p
+
+
+    @classmethod
+    def on_infection(cls, params: ConfigSEIARD, pop, idx: np.ndarray, rng):
         # Transition from S -> E (exposed)
-        if self.state == self.S:
-            self.state = self.E
-            self.days_remaining = max(1, int(np.random.normal(self.params.inc_period_mean, self.params.inc_period_std)))
+        return cls.E, sample_durations(rng, params.inc_period_mean, params.inc_period_std, len(idx))
 
 
-    def become_infectious(self) -> None:
-        # Transition from E -> IA or IS
-        if random.random() < self.params.p_symptomatic:
-            self.state = self.IS
-            self.days_remaining = max(
-                1, int(np.random.normal(
-                    self.params.inf_period_mean_IS, self.params.inf_period_std_IS
-                ))
-            )
-        else:
-            self.state = self.IA
-            self.days_remaining = max(
-                1, int(np.random.normal(
-                    self.params.inf_period_mean_IA, self.params.inf_period_std_IA
-                ))
-            )
+    @classmethod
+    def on_timer_expired(cls, params: ConfigSEIARD, pop, idx: np.ndarray, rng):
+        # E -> IA or IS, IA/IS -> R or D
+        exposed = pop.state[idx] == cls.E
+        u = rng.random(len(idx))
 
+        states = np.empty(len(idx), dtype=np.int8)
+        timers = np.zeros(len(idx), dtype=np.int64)
 
-    def progress(self) -> None:
-        # SEIAR-D infection timer and update states
-        if self.state in [self.E, self.IA, self.IS]:
-            self.days_remaining -= 1
-            if self.days_remaining <= 0:
-                if self.state == self.E:
-                    self.become_infectious()
-                elif self.state in [self.IA, self.IS]:
-                    # recovery or death
-                    if random.random() < self.params.mortality_by_group[self.age_group]:
-                        self.state = self.D
-                    else:
-                        self.state = self.R
+        symptomatic = exposed & (u < params.p_symptomatic)
+        asymptomatic = exposed & ~symptomatic
+        states[symptomatic] = cls.IS
+        timers[symptomatic] = sample_durations(
+            select(rng, symptomatic), params.inf_period_mean_IS, params.inf_period_std_IS, int(symptomatic.sum())
+        )
+        states[asymptomatic] = cls.IA
+        timers[asymptomatic] = sample_durations(
+            select(rng, asymptomatic), params.inf_period_mean_IA, params.inf_period_std_IA, int(asymptomatic.sum())
+        )
 
-    @property
-    def is_infectious(self) -> bool:
-        return self.state in [self.IA, self.IS]
\ No newline at end of file
+        # recovery or death
+        mortality = pop.group_values(params.mortality_by_group)[pop.age_group[idx]]
+        states[~exposed] = np.where(u[~exposed] < mortality[~exposed], cls.D, cls.R)
+        return states, timers
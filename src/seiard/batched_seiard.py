@@ -0,0 +1,180 @@
+import numpy as np
+
+from abm_network import load_network
+from network import GraphCache, DEFAULT_GRAPH_CACHE
+from population import Population, IndexSet
+from scheduler import CalendarQueue
+from rng import RNGStreams
+from intervention.interventions import InterventionManager, Triggered
+from seiard.config_seiard import ConfigSEIARD
+from seiard.agent_seiard import AgentSEIARD
+
+
+class BatchedNetworkSEIARD:
+    # Many replicates of the network SEIAR-D model advanced together
+    # (for ensembles of small models, where per-replicate Python overhead dominates)
+    #
+    # - one shared CSR graph (same network_type / net_params / seed as ABMNetworkSEIARD)
+    # - replicates x agents state matrix, stored flat (agent i of replicate r = r * N + i)
+    #   in one Population, so AgentSEIARD's vectorized transitions apply unchanged
+    # - every replicate has its own age groups, initial cases and random draws
+    #   (one RNGStreams for the batch, seeded by cfg.seed)
+    #
+    # Usage:
+    #   batch = BatchedNetworkSEIARD(cfg, replicates=200, network_type="watts_strogatz", k=10, beta=0.1)
+    #   batch.run(days=64)
+    #   batch.history          # [replicates x days x len(batch.keys)]
+    #   summarize(batch.histories(), 64)
+    #
+    # Notes:
+    # - Same daily phases as ABM.step(), batched transmission only
+    # - Interventions: scheduled contact effects (Lockdown) apply to all replicates,
+    #   any other intervention (masks, vaccination, tracing, triggers) raises ValueError
+    # - Replicates that die out keep their final counts
+
+    agent_cls = AgentSEIARD
+
+    def __init__(self, cfg: ConfigSEIARD, replicates: int = 100, interventions=None,
+                 network_type: str = "erdos_renyi", generator: str = "networkx",
+                 graph_cache: GraphCache | None = DEFAULT_GRAPH_CACHE, **net_params):
+        self.cfg = cfg
+        self.replicates = replicates
+        self.rng = RNGStreams(cfg.seed)
+        self.graph, _ = load_network(network_type, cfg.N, cfg.seed, net_params, generator, graph_cache)
+
+        R, N = replicates, cfg.N
+        cls = self.agent_cls
+        self.keys = [*cls.HISTORY_KEYS, "I_cumulative"]
+
+        # flat population of all replicates
+        probs = list(cfg.age_group_dist.values())
+        age_codes = self.rng.init.choice(len(probs), size=R * N, p=probs)
+        self.flat = Population(R * N, list(cfg.age_group_dist.keys()), age_codes)
+
+        state_codes = np.arange(len(cls.HISTORY_KEYS))
+        self._is_active = np.isin(state_codes, cls.ACTIVE)
+        self._is_infectious = np.isin(state_codes, cls.INFECTIOUS)
+        self.infectious = IndexSet(R * N)
+        self.timers = CalendarQueue()
+
+        # counts[replicate, state]
+        self.counts = np.zeros((R, len(state_codes)), dtype=np.int64)
+        self.counts[:, cls.S] = N
+
+        self.day = 0
+        self.total_infections = np.full(R, cfg.starting_total_infections, dtype=np.int64)
+        self._history: list[np.ndarray] = []
+
+        # I0 distinct initial cases per replicate, exposed, infectious at the end of day 0
+        seeds = np.argsort(self.rng.init.random((R, N)), axis=1)[:, :cfg.I0]
+        self._transition((seeds + np.arange(R)[:, None] * N).ravel(), cls.E, 0, 0)
+
+        self.interventions = InterventionManager(self._check_interventions(interventions))
+        self.current_contacts_by_group = cfg.contacts_by_group
+
+
+    @staticmethod
+    def _check_interventions(interventions):
+        # Only scheduled contact effects apply to the whole batch
+        for itv in interventions or []:
+            name = type(itv).__name__
+            if isinstance(itv, Triggered):
+                raise ValueError(f"{name}: triggered interventions are not supported by "
+                                 "BatchedNetworkSEIARD (conditions would read batch-wide counts)")
+            effects = itv.effects()
+            if effects is None:
+                raise ValueError(f"{name}: dynamic interventions are not supported by BatchedNetworkSEIARD")
+            kinds = {kind for kind, *_ in effects} - {"contacts"}
+            if kinds:
+                raise ValueError(f"{name}: '{sorted(kinds)[0]}' effects are not supported by "
+                                 "BatchedNetworkSEIARD (scheduled contact effects only)")
+        return interventions
+
+
+    def _transition(self, idx: np.ndarray, states, timers, bucket: int) -> None:
+        # State change of flat agents `idx` (unique), timers as in ABM._transition
+        # (bucket = first day whose timers have not been processed yet)
+        flat = self.flat
+        old_states = flat.state[idx]
+        flat.state[idx] = states
+        new_states = flat.state[idx]
+
+        was_inf = self._is_infectious[old_states]
+        now_inf = self._is_infectious[new_states]
+        self.infectious.remove(idx[was_inf & ~now_inf])
+        self.infectious.add(idx[now_inf & ~was_inf])
+
+        now_active = self._is_active[new_states]
+        due = bucket + np.maximum(timers, 1) - 1
+        flat.due_day[idx] = due
+        self.timers.schedule(idx[now_active], np.broadcast_to(due, idx.shape)[now_active])
+
+        R, K = self.counts.shape
+        rep = idx // self.cfg.N
+        self.counts -= np.bincount(rep * K + old_states, minlength=R * K).reshape(R, K)
+        self.counts += np.bincount(rep * K + new_states, minlength=R * K).reshape(R, K)
+
+
+    def count(self, state: str | int) -> int:
+        # Batch-wide number of agents in `state`
+        code = getattr(self.agent_cls, state) if isinstance(state, str) else state
+        return int(self.counts[:, code].sum())
+
+
+    @property
+    def history(self) -> np.ndarray:
+        # [replicates x days x len(keys)] counts, last column = I_cumulative
+        if not self._history:
+            return np.zeros((self.replicates, 0, len(self.keys)), dtype=np.int64)
+        return np.stack(self._history, axis=1)
+
+
+    def histories(self) -> list[dict[str, list[int]]]:
+        # Per-replicate history dicts (as model.history), e.g. for ensemble.summarize
+        h = self.history
+        return [{key: h[r, :, k].tolist() for k, key in enumerate(self.keys)} for r in range(self.replicates)]
+
+
+    # =================================
+    def step(self) -> None:
+        # One day of every replicate
+        self.interventions.apply(self)
+
+        cls, cfg, flat, N = self.agent_cls, self.cfg, self.flat, self.cfg.N
+
+        # Phase 1: contacts of all infectious agents of all replicates in one CSR gather
+        infectious = self.infectious.members()
+        node = infectious % N
+        contacts = flat.group_values(self.current_contacts_by_group, dtype=np.int64)
+        k = np.where(self.graph.degree[node] > 0, contacts[flat.age_group[infectious]], 0)
+        src = np.repeat(infectious, k)
+        targets = src - src % N + self.graph.random_neighbors(src % N, self.rng.contacts)
+
+        open_ = flat.state[targets] == cls.S
+        src, targets = src[open_], targets[open_]
+        p = cls.infectivity(cfg)[flat.state[src]]
+        p *= flat.group_values(cfg.susceptibility_by_group)[flat.age_group[targets]]
+        infected = np.unique(targets[self.rng.contacts.random(targets.size) < p])
+
+        # Phase 2: S -> E
+        states, timers = cls.on_infection(cfg, flat, infected, self.rng.progression)
+        self._transition(infected, states, timers, self.day)
+
+        # Phase 3: timers due today
+        expired = np.unique(self.timers.pop(self.day))
+        if expired.size:
+            states, timers = cls.on_timer_expired(cfg, flat, expired, self.rng.progression)
+            self._transition(expired, states, timers, self.day + 1)
+
+        # Phase 4: log
+        self.total_infections += np.bincount(infected // N, minlength=self.replicates)
+        self._history.append(np.column_stack([
+            self.counts[:, [getattr(cls, key) for key in cls.HISTORY_KEYS]], self.total_infections
+        ]))
+        self.day += 1
+
+
+    def run(self, days: int = 67) -> np.ndarray:
+        for _ in range(days):
+            self.step()
+        return self.history
@@ -0,0 +1,30 @@
+import numpy as np
+
+from tau_leap import TauLeap
+from seiard.agent_seiard import AgentSEIARD
+
+class TauLeapSEIARD(TauLeap):
+    # Tau-leaping SEIAR-D model (see TauLeap), same ConfigSEIARD as ABMNetworkSEIARD
+
+    agent_cls = AgentSEIARD
+
+    def _periods(self) -> dict[str, tuple[float, float]]:
+        return {
+            "E": (self.cfg.inc_period_mean, self.cfg.inc_period_std),
+            "IA": (self.cfg.inf_period_mean_IA, self.cfg.inf_period_std_IA),
+            "IS": (self.cfg.inf_period_mean_IS, self.cfg.inf_period_std_IS),
+        }
+
+
+    def _entry_state(self) -> str:
+        return "E"
+
+
+    def _exits(self, key: str) -> list[tuple[str, np.ndarray]]:
+        ones = np.ones(len(self.age_groups))
+        if key == "E":
+            p = self.cfg.p_symptomatic
+            return [("IS", p * ones), ("IA", (1 - p) * ones)]
+        # recovery or death
+        mortality = self._group_values(self.cfg.mortality_by_group)
+        return [("D", mortality), ("R", 1 - mortality)]
@@ -1,73 +1,14 @@
-import random
-from typing import List, Dict
 import numpy as np
-import networkx as nx
 
 from abm_network import ABMNetwork
-from seird.config_seird import ConfigSEIRD
 from seird.agent_seird import AgentSEIRD
 
-from intervention.interventions import InterventionManager
-
 class ABMNetworkSEIRD(ABMNetwork):
-    # Network-based SEIAR-D epidemic simulator
-
-    def __init__(self, cfg: ConfigSEIRD, interventions=None, network_type: str = "erdos_renyi", **net_params):
-        self.cfg = cfg
-        self._init_rng()
-
-        # Create agents (initially all susceptible)
-        # # #self.agents: List[AgentSEIRD] = [AgentSEIRD(cfg) for _ in range(cfg.N)]
-        age_assignments = self._assign_age_groups()
-        self.agents = [
-            AgentSEIRD(cfg, age_group=age_assignments[i])
-            for i in range(self.cfg.N)
-        ]
-
-        # Infect I0 randomly
-        initial_I = random.sample(range(cfg.N), cfg.I0)
-        for idx in initial_I:
-            self.agents[idx].state = AgentSEIRD.E
-        
-        self.cfg = cfg
-        self.network_type = network_type
-        self.net_params = net_params
-        self.G = self._create_network()
-
-        # Time-series tracking (store S/E/IA/IS/R/D counts per day)
-        self.history: Dict[str, list[int]] = {k: [] for k in ["S", "E", "I", "R", "D", "I_cumulative"]}
-        self.history_states: list[list[int]] = [] # stores list of agent states each day
-        
-        self.day: int = 0
-        self.total_infections = cfg.starting_total_infections
-        self.finished = False
-
-        # Interventions
-        self.interventions = InterventionManager(interventions)
-
-        # Dynamic parameter (modifiable by lockdown etc.)
-        self.current_contacts_by_group = cfg.contacts_by_group
-
-
-    # === PHASE 0.5 ===
-    def _should_continue(self) -> bool:
-        # Check if epidemic is still active
-        # Default behavior: stop when no infected remain
-
-        any_infected = any(a.state in [AgentSEIRD.E, AgentSEIRD.I] for a in self.agents)
-        return any_infected
+    # Network-based SEIR-D epidemic simulator
+    # disease states and transitions come from AgentSEIRD
 
+    agent_cls = AgentSEIRD
 
-    # === PHASE 4 ===
-    def _log_states(self, new_infections_today: int) -> None:
-        # Count all states for logging
-        states = [a.state for a in self.agents]
-        self.history["S"].append(states.count(AgentSEIRD.S))
-        self.history["E"].append(states.count(AgentSEIRD.E))
-        self.history["I"].append(states.count(AgentSEIRD.I))
-        self.history["R"].append(states.count(AgentSEIRD.R))
-        self.history["D"].append(states.count(AgentSEIRD.D))
-        self.history_states.append(states)
-        # Update cumulative infections
-        self.total_infections += new_infections_today
-        self.history["I_cumulative"].append(self.total_infections)
\ No newline at end of file
+    def _seed_infections(self, idx: np.ndarray) -> None:
+        # Initial cases start exposed and become infectious at the end of day 0
+        self._transition(idx, AgentSEIRD.E, 0)
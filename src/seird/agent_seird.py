@@ -1,7 +1,7 @@
-import random
 import numpy as np
 
-from agent import Agent
+from agent import Agent, sample_durations
+from rng import select
 from seird.config_seird import ConfigSEIRD
 
 class AgentSEIRD(Agent):
@@ -11,53 +11,39 @@ class AgentSEIRD(Agent):
     # 0 = Susceptible (S)
     # 1 = Exposed (E)
     # 2 = Infectious (I)
-    # 4 = Recovered (R)
-    # 5 = Dead (D)
+    # 3 = Recovered (R)
+    # 4 = Dead (D)
 
     S, E, I, R, D = range(5)
 
+    HISTORY_KEYS = ("S", "E", "I", "R", "D")
+    INFECTIOUS = (I,)
+    SYMPTOMATIC = (I,)
+    ACTIVE = (E, I)
 
-    def __init__(self, params: ConfigSEIRD, state: int = S, age_group: str = "adult"):
-        self.state: int = state
-        self.params = params
-        self.days_remaining: int = 0
-        self.mask_eff = 0
-        self.age_group = age_group
-        self.vaccinated: bool = False
+    __slots__ = ()
 
 
-    def infect(self):
+    @classmethod
+    def on_infection(cls, params: ConfigSEIRD, pop, idx: np.ndarray, rng):
         # Transition from S -> E (exposed)
-        if self.state == self.S:
-            self.state = self.E
-            self.days_remaining = max(1, int(np.random.normal(self.params.inc_period_mean, self.params.inc_period_std)))
-
-
-    def become_infectious(self) -> None:
-        # Transition from E -> I
-        
-        self.state = self.I
-        self.days_remaining = max(
-            1, int(np.random.normal(
-                self.params.inf_period_mean, self.params.inf_period_std
-            ))
-        )
-
-
-    def progress(self) -> None:
-        # SEIR-D infection timer and update states
-        if self.state in [self.E, self.I]:
-            self.days_remaining -= 1
-            if self.days_remaining <= 0:
-                if self.state == self.E:
-                    self.become_infectious()
-                elif self.state == self.I:
-                    # recovery or death
-                    if random.random() < self.params.mortality_by_group[self.age_group]:
-                        self.state = self.D
-                    else:
-                        self.state = self.R
-
-    @property
-    def is_infectious(self) -> bool:
-        return self.state == self.I
\ No newline at end of file
+        return cls.E, sample_durations(rng, params.inc_period_mean, params.inc_period_std, len(idx))
+
+
+    @classmethod
+    def on_timer_expired(cls, params: ConfigSEIRD, pop, idx: np.ndarray, rng):
+        # E -> I, I -> R or D
+        exposed = pop.state[idx] == cls.E
+        n_exp = int(exposed.sum())
+
+        states = np.empty(len(idx), dtype=np.int8)
+        timers = np.zeros(len(idx), dtype=np.int64)
+
+        states[exposed] = cls.I
+        timers[exposed] = sample_durations(select(rng, exposed), params.inf_period_mean, params.inf_period_std, n_exp)
+
+        # recovery or death
+        done = idx[~exposed]
+        mortality = pop.group_values(params.mortality_by_group)[pop.age_group[done]]
+        states[~exposed] = np.where(select(rng, ~exposed).random(len(done)) < mortality, cls.D, cls.R)
+        return states, timers
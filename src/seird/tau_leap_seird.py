@@ -0,0 +1,27 @@
+import numpy as np
+
+from tau_leap import TauLeap
+from seird.agent_seird import AgentSEIRD
+
+class TauLeapSEIRD(TauLeap):
+    # Tau-leaping SEIR-D model (see TauLeap), same ConfigSEIRD as ABMNetworkSEIRD
+
+    agent_cls = AgentSEIRD
+
+    def _periods(self) -> dict[str, tuple[float, float]]:
+        return {
+            "E": (self.cfg.inc_period_mean, self.cfg.inc_period_std),
+            "I": (self.cfg.inf_period_mean, self.cfg.inf_period_std),
+        }
+
+
+    def _entry_state(self) -> str:
+        return "E"
+
+
+    def _exits(self, key: str) -> list[tuple[str, np.ndarray]]:
+        if key == "E":
+            return [("I", np.ones(len(self.age_groups)))]
+        # recovery or death
+        mortality = self._group_values(self.cfg.mortality_by_group)
+        return [("D", mortality), ("R", 1 - mortality)]
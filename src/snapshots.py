@@ -0,0 +1,104 @@
+import os
+import numpy as np
+
+
+class SnapshotStore:
+    # Compact per-day record of every agent's state (used for network animations)
+    # Preallocated uint8 matrix [recorded days x agents], optionally memory-mapped
+    #
+    # Attributes:
+    # N      : int, number of agents (columns)
+    # stride : int, record every `stride`-th day only
+    # path   : str | None, back the matrix with a memory-mapped file on disk
+    # days   : list[int], simulation day of every recorded row
+    #
+    # Behaves like a read-only list of rows: len(store), store[t], iteration
+
+    def __init__(self, N: int, stride: int = 1, path: str | None = None, capacity: int = 16):
+        if stride < 1:
+            raise ValueError("stride must be >= 1")
+        self.N = N
+        self.stride = stride
+        self.path = path
+        self.days: list[int] = []
+        self._data = self._allocate(max(capacity, 1))
+
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if self.path is None:
+            return np.zeros((capacity, self.N), dtype=np.uint8)
+        return np.memmap(self.path, dtype=np.uint8, mode="w+", shape=(capacity, self.N))
+
+
+    def reserve(self, rows: int) -> None:
+        # Make sure `rows` more snapshots fit without reallocation
+        needed = len(self.days) + rows
+        if needed <= len(self._data):
+            return
+
+        if self.path is None:
+            data = np.zeros((needed, self.N), dtype=np.uint8)
+            data[:len(self.days)] = self._data[:len(self.days)]
+            self._data = data
+        else:
+            # grow the file in place, recorded rows stay where they are
+            self._data.flush()
+            del self._data
+            with open(self.path, "r+b") as f:
+                f.truncate(needed * self.N)
+            self._data = np.memmap(self.path, dtype=np.uint8, mode="r+", shape=(needed, self.N))
+
+
+    def record(self, day: int, states: np.ndarray) -> None:
+        # Store `states` if `day` falls on the sampling stride
+        if day % self.stride:
+            return
+        if len(self.days) == len(self._data):
+            self.reserve(len(self._data))   # double the capacity
+        self._data[len(self.days)] = states
+        self.days.append(day)
+
+
+    def array(self) -> np.ndarray:
+        # Recorded snapshots as one [rows x N] array (view, no copy)
+        return self._data[:len(self.days)]
+
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+
+    def __getitem__(self, t):
+        return self.array()[t]
+
+
+    def __iter__(self):
+        return iter(self.array())
+
+
+    def copy(self, path: str | None = None) -> "SnapshotStore":
+        # Copy of the recorded rows, in memory or memory-mapped to a new file `path`
+        # (never shares a memory-mapped file, an existing file is not overwritten)
+        if path is not None and os.path.exists(path):
+            raise FileExistsError(f"Snapshot file {path} already exists")
+        other = SnapshotStore(self.N, self.stride, path, capacity=len(self.days))
+        other._data[:len(self.days)] = self.array()
+        other.days = list(self.days)
+        return other
+
+
+    def __getstate__(self) -> dict:
+        # Pickle only the recorded rows (checkpoints)
+        state = self.__dict__.copy()
+        state["_data"] = np.array(self.array())
+        return state
+
+
+    def __setstate__(self, state: dict) -> None:
+        # Restored in memory: the file of a memory-mapped store may still belong
+        # to a running model (move it to a new file with copy(path))
+        self.__dict__.update(state)
+        self.path = None
+        rows = self._data
+        self._data = self._allocate(max(len(rows), 1))
+        self._data[:len(rows)] = rows
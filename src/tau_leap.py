@@ -0,0 +1,251 @@
+import math
+import numpy as np
+
+from config import Config
+from agent import Agent
+from intervention.interventions import InterventionManager
+from rng import RNGStreams
+from mixing import mixing_fractions
+
+class TauLeap:
+    # Approximate (tau-leaping) engine for very large populations (1M-10M agents)
+    # Same cfg, run(days) / history interface as ABM, but instead of agents it keeps
+    # counts per compartment x age group and draws aggregated binomial transition
+    # counts per time step, so cost does not depend on N
+    #
+    # Model:
+    # - well-mixed transmission (as ABM): infectious agents of group h make
+    #   k_h contacts/day to uniformly chosen agents, each infecting with p * sus_target
+    #   (cfg.contact_matrix: a share fractions[h, g] of them to uniformly chosen agents of group g)
+    # - periods use the moments of the agent model's discretized durations
+    #   max(1, int(normal(mean, std))), the state entered on infection is one day
+    #   shorter (infections of day d only act from day d+1 in the daily stepper);
+    #   they are approximated by Erlang chains of n = (mean / std)^2 stages
+    # - step size tau is adaptive: every compartment may change by at most ~epsilon
+    #   of its size per leap (Cao-Gillespie-Petzold), bounded below by min_tau,
+    #   leaps never cross day boundaries
+    #
+    # Notes:
+    # - Interventions are applied at the start of every day; only those acting on
+    #   model-level parameters (e.g. Lockdown -> current_contacts_by_group) apply,
+    #   there are no agents to put masks on or vaccinate
+    # - Use it to screen scenarios, confirm with the agent model
+
+    agent_cls = Agent
+    MAX_STAGES = 50
+
+    def __init__(self, cfg: Config, interventions=None, epsilon: float = 0.03, min_tau: float = 0.01):
+        self.cfg = cfg
+        self.epsilon = epsilon
+        self.min_tau = min_tau
+        self._init_rng()
+
+        self.age_groups = list(cfg.age_group_dist.keys())
+        G = len(self.age_groups)
+
+        # compartment rows: S, stages of every timed state, terminal states
+        # self.X[row, group] = number of agents
+        periods = self._periods()
+        self._rows: dict[str, list[int]] = {}
+        rates = []
+        for key in self.agent_cls.HISTORY_KEYS:
+            if key in periods:
+                mean, std = self._period_moments(*periods[key])
+                if key == self._entry_state():
+                    mean = max(mean - 1, 0.1)
+                n = self.MAX_STAGES if std <= 0 else int(np.clip(round((mean / std) ** 2), 1, self.MAX_STAGES))
+                rates += [n / mean] * n
+            else:
+                n = 1
+                rates += [0.0]
+            self._rows[key] = list(range(len(rates) - n, len(rates)))
+        self._stage_rates = np.array(rates)[:, None]
+        self._exit_table = {key: self._exits(key) for key in periods}
+        self.X = np.zeros((len(rates), G), dtype=np.int64)
+
+        # group-level parameters
+        self._sus = self._group_values(cfg.susceptibility_by_group)
+        infectivity = self.agent_cls.infectivity(cfg)
+        self._infectivity = {
+            key: infectivity[getattr(self.agent_cls, key)]
+            for key in self.agent_cls.HISTORY_KEYS
+            if getattr(self.agent_cls, key) in self.agent_cls.INFECTIOUS
+        }
+
+        # population and initial infections split across age groups
+        probs = list(cfg.age_group_dist.values())
+        sizes = self.rng.init.multinomial(cfg.N, probs)
+        seeds = self.rng.init.multivariate_hypergeometric(sizes, cfg.I0)
+        self.X[self._rows["S"][0]] = sizes - seeds
+        self.X[self._rows[self._entry_state()][0]] += seeds
+        self._sizes = sizes
+        self._mixing = (
+            mixing_fractions(cfg.contact_matrix, self.age_groups, sizes)
+            if cfg.contact_matrix is not None else None
+        )
+
+        # Time-series tracking (store counts per compartment per day)
+        self.history: dict[str, list[int]] = {
+            k: [] for k in [*self.agent_cls.HISTORY_KEYS, "I_cumulative"]
+        }
+
+        self.day: int = 0
+        self.total_infections = cfg.starting_total_infections
+        self.finished = False
+
+        # Interventions
+        self.interventions = InterventionManager(interventions)
+
+        # Dynamic parameter (modifiable by lockdown etc.)
+        self.current_contacts_by_group = cfg.contacts_by_group
+
+
+    def _init_rng(self) -> None:
+        self.rng = RNGStreams(self.cfg.seed)
+
+
+    def _group_values(self, by_group: dict) -> np.ndarray:
+        return np.array([by_group[g] for g in self.age_groups], dtype=np.float64)
+
+
+    # === model description (override in subclasses) ===
+    def _periods(self) -> dict[str, tuple[float, float]]:
+        # Timed compartments -> (mean, std) of the time spent in them
+        return {"I": (self.cfg.inf_period_mean, self.cfg.inf_period_std)}
+
+
+    def _entry_state(self) -> str:
+        # Compartment entered on infection
+        return "I"
+
+
+    def _exits(self, key: str) -> list[tuple[str, np.ndarray]]:
+        # Where agents leaving timed compartment `key` go: [(target, prob per group)]
+        return [("R", np.ones(len(self.age_groups)))]
+
+
+    # === helpers ===
+    @staticmethod
+    def _period_moments(mean: float, std: float) -> tuple[float, float]:
+        # Mean and std of T = max(1, int(X)), X ~ normal(mean, std)
+        if std <= 0:
+            T = max(1, int(mean))
+            return float(T), 0.0
+        cdf = lambda x: 0.5 * (1 + math.erf((x - mean) / (std * math.sqrt(2))))
+        ks = np.arange(1, max(2, int(mean + 10 * std) + 2))
+        pmf = np.array([cdf(k + 1) - cdf(k) for k in ks])
+        pmf[0] = cdf(2)
+        pmf /= pmf.sum()
+        m = float((ks * pmf).sum())
+        return m, float(math.sqrt(max((ks ** 2 * pmf).sum() - m * m, 0.0)))
+
+
+    def count(self, key: str) -> int:
+        return int(self.X[self._rows[key]].sum())
+
+
+    def _active(self) -> int:
+        return sum(self.count(key) for key in self._exit_table)
+
+
+    def _rates(self) -> tuple[np.ndarray, np.ndarray]:
+        # Returns (infection hazard per susceptible by group, stage exit rates per row/group)
+        contacts = self._group_values(self.current_contacts_by_group)
+        pressure = np.zeros(len(self.age_groups))
+        for key, p in self._infectivity.items():
+            pressure += p * self.X[self._rows[key]].sum(axis=0)
+        if self._mixing is None:
+            foi = (contacts * pressure).sum() / self.cfg.N
+        else:
+            foi = (contacts * pressure) @ self._mixing / np.maximum(self._sizes, 1)
+        return self._sus * foi, self._stage_rates * self.X
+
+
+    def _choose_tau(self, hazard: np.ndarray, outflow: np.ndarray, max_tau: float) -> float:
+        # Largest tau for which every compartment changes by <= epsilon of its size
+        # (mean and standard deviation of the change, Poisson approximation)
+        inflow = np.zeros_like(outflow)
+        S = self._rows["S"][0]
+        outflow = outflow.copy()
+        outflow[S] = hazard * self.X[S]
+        inflow[self._rows[self._entry_state()][0]] += outflow[S]
+        for key in self._exit_table:
+            rows = self._rows[key]
+            inflow[rows[1:]] += outflow[rows[:-1]]
+            for target, prob in self._exit_table[key]:
+                inflow[self._rows[target][0]] += outflow[rows[-1]] * prob
+
+        drift = np.abs(inflow - outflow)
+        var = inflow + outflow
+        bound = np.maximum(self.epsilon * self.X, 1.0)
+        with np.errstate(divide="ignore"):
+            tau = min(
+                np.min(np.where(drift > 0, bound / drift, np.inf)),
+                np.min(np.where(var > 0, bound ** 2 / var, np.inf)),
+            )
+        return float(min(tau, max_tau))
+
+
+    def _leap(self, tau: float, hazard: np.ndarray) -> int:
+        # Draw aggregated transition counts for one step of length tau
+        # Returns number of new infections
+        X = self.X
+        S = self._rows["S"][0]
+
+        # binomial draws on the counts at the start of the leap (no negative counts)
+        infected = self.rng.contacts.binomial(X[S], -np.expm1(-hazard * tau))
+        moved = self.rng.progression.binomial(X, -np.expm1(-self._stage_rates * tau))
+
+        X[S] -= infected
+        X[self._rows[self._entry_state()][0]] += infected
+        for key in self._exit_table:
+            rows = self._rows[key]
+            X[rows] -= moved[rows]
+            X[rows[1:]] += moved[rows[:-1]]
+
+            # leaving the last stage: split between exits
+            remaining = moved[rows[-1]]
+            mass = np.ones(len(self.age_groups))
+            exits = self._exit_table[key]
+            for n, (target, prob) in enumerate(exits):
+                if n == len(exits) - 1:
+                    k = remaining
+                else:
+                    k = self.rng.progression.binomial(remaining, np.clip(prob / np.maximum(mass, 1e-12), 0, 1))
+                X[self._rows[target][0]] += k
+                remaining = remaining - k
+                mass = mass - prob
+        return int(infected.sum())
+
+
+    # =================================
+    def step(self) -> bool:
+        # One day = as many adaptive leaps as needed to reach the next day boundary
+        self.interventions.apply(self)
+
+        if self._active() == 0:
+            self.finished = True
+            print(f"Nobody infected. Terminating simulation on day {self.day}.")
+            return False
+
+        t = 0.0
+        new_infections = 0
+        while t < 1.0:
+            hazard, outflow = self._rates()
+            tau = min(max(self._choose_tau(hazard, outflow, 1.0 - t), self.min_tau), 1.0 - t)
+            new_infections += self._leap(tau, hazard)
+            t += tau
+
+        for key in self.agent_cls.HISTORY_KEYS:
+            self.history[key].append(self.count(key))
+        self.total_infections += new_infections
+        self.history["I_cumulative"].append(self.total_infections)
+
+        self.day += 1
+        return True
+
+
+    def run(self, days: int = 67):
+        for _ in range(days):
+            if not self.step():
+                break
@@ -51,6 +51,33 @@ def plot_history(history: Dict[str, list[int]], model_type = "SIR"):
     return fig
 
 
+def plot_ensemble(bands: Dict[str, dict], model_type = "SIR", keys=None):
+    # Plot ensemble median with 5-95% bands (output of ensemble.run_ensemble)
+    #
+    # Parameters:
+    # bands      : dict[str, dict[str, np.ndarray]] (key -> {"q05", "q50", "q95", ...})
+    # model_type : str; used in the title
+    # keys       : list[str] | None, history keys to draw (default: all)
+    #
+    # Returns:
+    # plt.figure.Figure
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for k in keys or bands.keys():
+        days = np.arange(len(bands[k]["q50"]))
+        ax.plot(days, bands[k]["q50"], color=COLORS[k], label=LABELS[k])
+        ax.fill_between(days, bands[k]["q05"], bands[k]["q95"], color=COLORS[k], alpha=0.25)
+    ax.set_xlabel("Day")
+    ax.set_ylabel("Individuals")
+    ax.set_title(f"ABM {model_type} Ensemble (median, 5-95%)")
+    ax.legend()
+    fig.tight_layout()
+    ax.grid(True, linestyle="--", alpha=0.5)
+    plt.show()
+
+    return fig
+
+
 def plot_network(G, agent_states=None, figsize=(6, 6), model_type = "SIR"):
     # Draw contact network using spring-layout
 
@@ -93,14 +120,15 @@ def plot_network(G, agent_states=None, figsize=(6, 6), model_type = "SIR"):
 def animate_network_spread(model, interval=150, figsize=(12, 12), model_type="SIR"):
     # Animate infection spread on the model's network.
 
-    if not hasattr(model, "history_states"):
+    if getattr(model, "history_states", None) is None:
         raise ValueError(
             "Model must store daily node state history in model.history_states. "
-            "Modify step() to append `[a.state for a in agents]` each day."
+            "Create the network model with record_states=True."
         )
 
     G = model.G
-    history = model.history_states  # list of length T, each entry = list of states per node
+    history = model.history_states  # T snapshots, each entry = states per node
+    days = getattr(history, "days", range(len(history)))  # simulation day of each snapshot
     T = len(history)
 
     pos = nx.spring_layout(G, seed=42, iterations=100)
@@ -146,7 +174,7 @@ def animate_network_spread(model, interval=150, figsize=(12, 12), model_type="SI
         states = history[frame]
         node_colors = [color_map[s] for s in states]       
         nodes.set_color(node_colors)             
-        ax.set_title(f"{model_type} day {frame}")
+        ax.set_title(f"{model_type} day {days[frame]}")
         return nodes,
 
     ani = FuncAnimation(
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules import each other flat from src/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,23 @@
+import numpy as np
+
+import graph_generators
+
+
+def _edges(graph):
+    rows = np.repeat(np.arange(graph.N), graph.degree)
+    return {(a, b) for a, b in zip(rows.tolist(), graph.indices.tolist()) if a < b}
+
+
+def test_watts_strogatz_complete_lattice_terminates():
+    # k = N - 1: every node is joined to all others, nothing can be rewired (networkx: 55 edges)
+    graph = graph_generators.watts_strogatz(11, 10, 0.5, np.random.default_rng(0))
+    assert len(_edges(graph)) == 55
+    assert (graph.degree == 10).all()
+
+
+def test_watts_strogatz_dense_graph_is_simple():
+    for seed in range(5):
+        graph = graph_generators.watts_strogatz(12, 10, 0.9, np.random.default_rng(seed))
+        rows = np.repeat(np.arange(graph.N), graph.degree)
+        assert (rows != graph.indices).all()
+        assert len(_edges(graph)) * 2 == graph.indices.size
@@ -0,0 +1,49 @@
+import numpy as np
+
+from config import Config
+from abm import ABM
+from intervention.interventions import Triggered
+from intervention.interventions_examples import Vaccines, ContactTracing, TargetedVaccines
+from intervention.triggers import Above, Below, prevalence
+
+
+def test_vaccines_rate_above_one_vaccinates_every_complier():
+    # daily_vaccines >= 1 = a dose for every susceptible agent every day
+    cfg = Config(N=500, I0=5, seed=1)
+    model = ABM(cfg, [Vaccines(start_day=0, end_day=1, daily_vaccines=20, compliance=1.0, efficacy=1.0)])
+    model.run(1)
+
+    susceptible = model.pop.state == model.agent_cls.S
+    assert model.pop.vaccinated[susceptible].all()
+
+
+def test_vaccines_rate_above_one_keeps_compliance():
+    cfg = Config(N=2000, I0=5, seed=1)
+    model = ABM(cfg, [Vaccines(start_day=0, end_day=1, daily_vaccines=20, compliance=0.5, efficacy=1.0)])
+    model.run(1)
+
+    assert 0.4 < np.mean(model.pop.vaccinated) < 0.6
+
+
+def test_contact_tracing_quarantines_in_loop_mode():
+    # loop transmission records contacts for the tracer and honours quarantine
+    cfg = Config(N=1000, I0=10, seed=1)
+    model = ABM(cfg, [ContactTracing(2, None, detection=1.0, trace_prob=1.0)], transmission="loop")
+    model.run(10)
+
+    assert len(model.tracer.contacts_of(np.arange(cfg.N), model.day)) > 0
+    quarantined = np.flatnonzero(model.quarantined_until > model.day)
+    assert quarantined.size > 0
+
+
+def test_triggered_dynamic_intervention_keeps_its_own_window():
+    # dynamic interventions run while triggered, but only inside their own window
+    always = dict(on=Above(prevalence, 0.0), off=Below(prevalence, -1.0))
+    inside = Triggered(TargetedVaccines(0, None, 50), **always)
+    outside = Triggered(TargetedVaccines(100, None, 50), **always)
+
+    for itv, doses in ((inside, True), (outside, False)):
+        model = ABM(Config(N=2000, I0=20, seed=1), [itv])
+        model.run(5)
+        assert itv.switches[0] == (0, True)
+        assert model.pop.vaccinated.any() == doses